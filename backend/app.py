@@ -1,9 +1,26 @@
-from flask import Flask, jsonify, request
+from flask import Flask, abort, jsonify, request
 from flask_cors import CORS
-from models import db, Product, PricingRule
+from sqlalchemy import bindparam, event, insert, select, text, update
+from sqlalchemy.engine import Engine
+from models import db, Product, PricingRule, bulk_as_dicts
+from rule_kernel import encode_rules, MIN_MULTIPLIER, MAX_MULTIPLIER
+try:
+    # Ahead-of-time build of the kernels (python build_kernels.py): no JIT warm-up
+    from pricing_kernel import apply_guardrails, apply_rules
+except ImportError:
+    from rule_kernel import apply_guardrails, apply_rules
 import os
+import sqlite3
+import time
 import joblib
+import numpy as np
 import pandas as pd
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
 from datetime import datetime
 
 app = Flask(__name__)
@@ -16,15 +33,82 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 db.init_app(app)
 
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed during a write and NORMAL sync only fsyncs at checkpoints
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
 # Load ML Model
 MODEL_PATH = os.path.join(BASE_DIR, 'models', 'pricing_model.joblib')
+ML_FEATURES = ['hour', 'day_of_week', 'inventory_level', 'bartender_load']
 model = None
-try:
-    if os.path.exists(MODEL_PATH):
-        model = joblib.load(MODEL_PATH)
-        print("ML Model loaded successfully.")
-except Exception as e:
-    print(f"Error loading model: {e}")
+
+class NamedColumnsModel:
+    """
+    Adapter for estimators fitted on a DataFrame: accepts a plain ndarray and
+    attaches the column names internally, so callers never build DataFrames.
+    """
+    def __init__(self, estimator, columns):
+        self.estimator = estimator
+        self.columns = list(columns)
+
+    def predict(self, rows):
+        return self.estimator.predict(pd.DataFrame(rows, columns=self.columns, copy=False))
+
+def predict_multipliers(rows):
+    """Predict price multipliers for an (N, 4) array of ML_FEATURES rows in one call."""
+    return model.predict(rows)
+
+# The model only ever sees 24 hours x 7 days x two [0, 1] levels, so it is swept once
+# over that domain (levels quantized to LUT_LEVELS buckets) and requests just index it.
+LUT_LEVELS = 16
+_MULTIPLIER_LUT = None
+
+def build_multiplier_lut():
+    """Predict every (hour, day_of_week, inventory bucket, load bucket) combination."""
+    levels = np.linspace(0.0, 1.0, LUT_LEVELS)
+    grid = np.meshgrid(np.arange(24), np.arange(7), levels, levels, indexing='ij')
+    rows = np.stack([g.ravel() for g in grid], axis=1).astype(np.float32)
+    return np.asarray(predict_multipliers(rows), dtype=np.float32).reshape(24, 7, LUT_LEVELS, LUT_LEVELS)
+
+def _level_bucket(level):
+    """Nearest LUT bucket for a level in [0, 1]."""
+    return int(min(max(level, 0.0), 1.0) * (LUT_LEVELS - 1) + 0.5)
+
+def lookup_multipliers(rows):
+    """Vectorized LUT lookup for an (N, 4) array of ML_FEATURES rows."""
+    rows = np.asarray(rows)
+    levels = (np.clip(rows[:, 2:4], 0.0, 1.0) * (LUT_LEVELS - 1) + 0.5).astype(np.intp)
+    return _MULTIPLIER_LUT[rows[:, 0].astype(np.intp), rows[:, 1].astype(np.intp), levels[:, 0], levels[:, 1]]
+
+def load_model():
+    """(Re)load the pricing model and rebuild its multiplier lookup table."""
+    global model, _MULTIPLIER_LUT
+    try:
+        if os.path.exists(MODEL_PATH):
+            estimator = joblib.load(MODEL_PATH)
+            if hasattr(estimator, 'n_jobs'):
+                estimator.n_jobs = 1  # Inputs are tiny; spinning up worker threads costs more than it saves
+            if hasattr(estimator, 'feature_names_in_'):
+                model = NamedColumnsModel(estimator, estimator.feature_names_in_)
+            else:
+                model = estimator
+            print("ML Model loaded successfully.")
+        _MULTIPLIER_LUT = build_multiplier_lut() if model else None
+    except Exception as e:
+        print(f"Error loading model: {e}")
+
+# The estimator's OpenMP runtime and the compiled kernels start thread pools that don't
+# survive fork(), so a preforking server (gunicorn.conf.py) sets this and loads the
+# model per worker after forking
+if not os.environ.get('PRICING_API_DEFER_MODEL_LOAD'):
+    load_model()
 
 class PricingLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -35,6 +119,10 @@ class PricingLog(db.Model):
     reason = db.Column(db.String(255))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Newest-first scans over a time range (analytics, log views by date) read this
+    # index in order instead of sorting the table
+    __table_args__ = (db.Index('ix_log_ts_id', timestamp.desc(), id.desc()),)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -61,71 +149,254 @@ with app.app_context():
     
     db.session.commit()
 
+def _version_ddl(version_table, watched_table):
+    """
+    DDL for a one-row counter that triggers bump on any write to watched_table, from
+    whichever process (gunicorn worker, script) makes it.
+    """
+    return [
+        f"CREATE TABLE IF NOT EXISTS {version_table} (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        f"INSERT OR IGNORE INTO {version_table} (id, version) VALUES (1, 0)",
+    ] + [
+        f"CREATE TRIGGER IF NOT EXISTS {watched_table}_{op.lower()}_version "
+        f"AFTER {op} ON {watched_table} BEGIN UPDATE {version_table} SET version = version + 1; END"
+        for op in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+# Active rules and the product catalog change rarely, so they are kept in memory
+# instead of being queried per request. Each cache is keyed on its table's counter,
+# so every worker picks up edits on a later lookup (see get_active_rules).
+with app.app_context():
+    with db.engine.begin() as conn:
+        for statement in (_version_ddl('rules_version', PricingRule.__tablename__)
+                          + _version_ddl('catalog_version', Product.__tablename__)):
+            conn.exec_driver_sql(statement)
+        # create_all skips indexes on tables that already exist
+        for index in PricingLog.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+# Seconds a worker trusts its last rules_version read before checking it again
+RULES_VERSION_TTL = 1.0
+
+# (version, (rule_codes, adjustment_factors), checked_at) for the compiled rule kernel
+_rules_cache = None
+
+def get_active_rules():
+    """
+    Return encoded active pricing rules, reloading them if any rule changed.
+    
+    The version row is re-read at most once per RULES_VERSION_TTL per worker, so a
+    burst of pricing requests doesn't pay a query each; the trade-off is that a rule
+    edit can take up to that long to reach every worker.
+    """
+    global _rules_cache
+    cache = _rules_cache
+    now = time.monotonic()
+    if cache is not None and now - cache[2] < RULES_VERSION_TTL:
+        return cache[1]
+    version = db.session.execute(text("SELECT version FROM rules_version")).scalar()
+    if cache is None or cache[0] != version:
+        rules = encode_rules(db.session.execute(
+            select(PricingRule.rule_type, PricingRule.adjustment_factor).where(PricingRule.is_active == True)
+        ).all())
+        cache = (version, rules, now)
+    else:
+        cache = (version, cache[1], now)
+    _rules_cache = cache
+    return cache[1]
+
+with app.app_context():
+    get_active_rules()
+
+def _dumps(payload):
+    """Serialize to JSON with orjson when it is installed."""
+    return orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload)
+
+# Columns read to reprice a product and build its response. The pricing endpoints
+# select these as plain Core rows, skipping ORM identity-map and instrumentation work.
+_PRODUCT_COLUMNS = Product.columns_tuple()
+_PRODUCT_FIELDS = tuple(c.key for c in _PRODUCT_COLUMNS)
+
+# Encoded /products body: (catalog_version, body). Product writes from any process,
+# including ones that don't log a reprice, bump the version through its triggers.
+_product_store = None
+
+def get_product_store():
+    """Return the encoded JSON body for /products, re-encoding it if the catalog changed."""
+    global _product_store
+    version = db.session.execute(text("SELECT version FROM catalog_version")).scalar()
+    store = _product_store
+    if store is None or store[0] != version:
+        rows = db.session.execute(select(*_PRODUCT_COLUMNS).order_by(Product.id)).all()
+        payload = [dict(zip(_PRODUCT_FIELDS, row)) for row in rows]
+        store = _product_store = (version, _dumps(payload))
+    return store[1]
+
 @app.route('/products', methods=['GET'])
 def get_products():
-    products = Product.query.all()
-    return jsonify([p.to_dict() for p in products])
+    body = get_product_store()
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/rules', methods=['GET'])
 def get_rules():
-    rules = PricingRule.query.all()
-    return jsonify([r.to_dict() for r in rules])
+    return app.response_class(_dumps(bulk_as_dicts(PricingRule.query)), mimetype='application/json')
 
 @app.route('/pricing-logs', methods=['GET'])
 def get_pricing_logs():
-    logs = PricingLog.query.order_by(PricingLog.timestamp.desc()).limit(10).all()
-    return jsonify([l.to_dict() for l in logs])
-
-@app.route('/calculate-price/<int:product_id>', methods=['POST'])
-def calculate_price(product_id):
-    product = Product.query.get_or_404(product_id)
-    old_price = product.current_price
+    """
+    Newest pricing logs first, keyset-paginated.
+    
+    Query params: limit (default 10, max 100) and cursor (the X-Next-Cursor header
+    of the previous page). Seeks on the primary key, so deep pages cost the same as
+    the first one instead of scanning and sorting the whole table.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        cursor = request.args.get('cursor', type=int)
+        if 'cursor' in request.args and cursor is None:
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
+    
+    query = PricingLog.query
+    if cursor is not None:
+        query = query.filter(PricingLog.id < cursor)
+    logs = query.order_by(PricingLog.id.desc()).limit(limit).all()
     
-    # Inputs for ML
-    now = datetime.now()
-    hour = now.hour
-    day_of_week = now.weekday()
+    response = jsonify([l.to_dict() for l in logs])
+    if len(logs) == limit:
+        response.headers['X-Next-Cursor'] = str(logs[-1].id)
+    return response
+
+def _ml_inputs(product, now):
+    """ML feature values for a product, in ML_FEATURES order."""
     inventory_level = min(1.0, product.inventory_count / 100.0) # Assume 100 is max
     bartender_load = 0.5 # Simulated default
+    return now.hour, now.weekday(), inventory_level, bartender_load
+
+# Price write for one product; executed with a list of rows (executemany) per request
+_UPDATE_PRICE = (
+    update(Product.__table__)
+    .where(Product.__table__.c.id == bindparam('product_id'))
+    .values(current_price=bindparam('new_price'))
+)
+
+def _raw_multiplier(product, rules=None):
+    """
+    Model (or rule-based) multiplier for a product before guardrails, with its reason.
     
-    multiplier = 1.0
-    reason = "Standard Pricing"
+    rules: get_active_rules() result, when the caller already has it (batches)
+    """
+    if _MULTIPLIER_LUT is not None:
+        # Predict using ML (precomputed over the quantized input domain)
+        hour, day_of_week, inventory_level, bartender_load = _ml_inputs(product, datetime.now())
+        multiplier = float(_MULTIPLIER_LUT[hour, day_of_week,
+                                           _level_bucket(inventory_level), _level_bucket(bartender_load)])
+        return multiplier, "AI-Driven Optimization"
     
-    if model:
-        # Predict using ML
-        input_data = pd.DataFrame([[hour, day_of_week, inventory_level, bartender_load]], 
-                                 columns=['hour', 'day_of_week', 'inventory_level', 'bartender_load'])
-        multiplier = float(model.predict(input_data)[0])
-        reason = "AI-Driven Optimization"
-    else:
-        # Fallback to rules
-        rules = PricingRule.query.filter_by(is_active=True).all()
-        for rule in rules:
-            if rule.rule_type == 'inventory_low' and product.inventory_count < 10:
-                multiplier *= rule.adjustment_factor
-                reason = "Rule-based: Low Inventory"
+    # Fallback to rules
+    rule_codes, rule_factors = rules if rules is not None else get_active_rules()
+    multiplier, applied = apply_rules(rule_codes, rule_factors, product.inventory_count)
+    return multiplier, "Rule-based: Low Inventory" if applied else "Standard Pricing"
 
-    # Apply Ethical Guardrails (PRD: max +20% / max -15%)
-    multiplier = max(0.85, min(1.20, multiplier))
+def _reprice_rows(product, multiplier, new_price, reason):
+    """
+    Build the outputs of repricing one product (no database writes).
     
-    new_price = round(product.base_price * multiplier, 2)
-    product.current_price = new_price
+    product: a row of _PRODUCT_COLUMNS
     
+    Returns:
+        Tuple of (response dict, PricingLog row, _UPDATE_PRICE parameters)
+    """
     # Log the change
-    log = PricingLog(
-        product_id=product.id,
-        old_price=old_price,
-        new_price=new_price,
-        multiplier=round(multiplier, 2),
-        reason=reason
-    )
-    db.session.add(log)
-    db.session.commit()
+    log_row = {
+        'product_id': product.id,
+        'old_price': product.current_price,
+        'new_price': new_price,
+        'multiplier': round(multiplier, 2),
+        'reason': reason,
+    }
+    price_row = {'product_id': product.id, 'new_price': new_price}
     
-    response = product.to_dict()
+    response = dict(product._mapping)
+    response['current_price'] = new_price
     response['ai_multiplier'] = round(multiplier, 2)
     response['reason'] = reason
+    return response, log_row, price_row
+
+def _reprice(product):
+    """Recompute a single product's price; see _reprice_rows for the return value."""
+    multiplier, reason = _raw_multiplier(product)
+    
+    # Apply Ethical Guardrails (PRD: max +20% / max -15%)
+    multiplier = apply_guardrails(multiplier)
+    
+    new_price = round(product.base_price * multiplier, 2)
+    return _reprice_rows(product, multiplier, new_price, reason)
+
+def _write_prices(conn, log_rows, price_rows):
+    """Insert the logs and update the prices with one executemany each (Core, no unit of work)."""
+    conn.execute(insert(PricingLog.__table__), log_rows)
+    conn.execute(_UPDATE_PRICE, price_rows)
+
+@app.route('/calculate-price/<int:product_id>', methods=['POST'])
+def calculate_price(product_id):
+    # Read, product update and log insert share one connection and transaction
+    with db.engine.begin() as conn:
+        product = conn.execute(select(*_PRODUCT_COLUMNS).where(Product.id == product_id)).first()
+        if product is None:
+            abort(404)
+        response, log_row, price_row = _reprice(product)
+        _write_prices(conn, [log_row], [price_row])
     return jsonify(response)
 
+@app.route('/calculate-price/batch', methods=['POST'])
+def calculate_price_batch():
+    """
+    Reprice several products under a single BEGIN ... COMMIT.
+    
+    Body: {"ids": [product ids]}. Repeated ids are repriced once (first
+    occurrence order). Like the single-product route, an unknown id is a 404,
+    and nothing is written unless every product exists.
+    """
+    data = request.get_json(silent=True)
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not ids:
+        return jsonify({'error': 'ids must be a non-empty list'}), 400
+    if not all(type(pid) is int for pid in ids):
+        return jsonify({'error': 'ids must be integers'}), 400
+    ids = list(dict.fromkeys(ids))
+    
+    with db.engine.begin() as conn:
+        by_id = {p.id: p for p in conn.execute(select(*_PRODUCT_COLUMNS).where(Product.id.in_(ids)))}
+        missing = [pid for pid in ids if pid not in by_id]
+        if missing:
+            return jsonify({'error': 'Products not found', 'missing': missing}), 404
+        products = [by_id[pid] for pid in ids]
+        
+        if _MULTIPLIER_LUT is not None:
+            # One vectorized lookup for the whole batch instead of one per product
+            now = datetime.now()
+            rows = np.array([_ml_inputs(p, now) for p in products], dtype=np.float32)
+            multipliers = lookup_multipliers(rows).astype(np.float64)
+            reasons = ["AI-Driven Optimization"] * len(products)
+        else:
+            rules = get_active_rules()
+            raw = [_raw_multiplier(p, rules) for p in products]
+            multipliers = np.array([m for m, _ in raw], dtype=np.float64)
+            reasons = [r for _, r in raw]
+        
+        # Guardrails and price rounding over the whole batch at once
+        np.clip(multipliers, MIN_MULTIPLIER, MAX_MULTIPLIER, out=multipliers)
+        base_prices = np.array([p.base_price for p in products], dtype=np.float64)
+        new_prices = np.round(base_prices * multipliers, 2)
+        
+        responses, log_rows, price_rows = zip(*[
+            _reprice_rows(p, m, price, reason)
+            for p, m, price, reason in zip(products, multipliers.tolist(), new_prices.tolist(), reasons)
+        ])
+        _write_prices(conn, list(log_rows), list(price_rows))
+    return jsonify(list(responses))
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
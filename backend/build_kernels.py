@@ -0,0 +1,27 @@
+"""
+Ahead-of-time compile the pricing kernels with Numba.
+
+Produces the `pricing_kernel` extension module next to this file. app.py
+imports it when present, so the first /calculate-price request pays no JIT
+compilation cost; otherwise it falls back to the JIT kernels in rule_kernel.py.
+
+Usage:
+    python build_kernels.py
+"""
+
+import os
+from numba.pycc import CC
+
+import rule_kernel
+
+cc = CC('pricing_kernel')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Export the same Python source the JIT path uses, so both stay in sync
+cc.export('apply_guardrails', 'f8(f8)')(rule_kernel.apply_guardrails.py_func)
+cc.export('apply_rules', 'Tuple((f8, i8))(i1[:], f8[:], i8)')(rule_kernel.apply_rules.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built pricing_kernel in {cc.output_dir}")
@@ -9,10 +9,53 @@ This module manages:
 """
 
 import pandas as pd
+import itertools
 import json
+import re
+import sys
+import types
+import weakref
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
-from collections import defaultdict
+from typing import Dict, Mapping, Optional
+
+from stats_kernel import group_medians
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Ultimate fallback costs by type when neither the config nor a price is available.
+# This is a rough estimate - should be replaced with actual cost data
+_TYPE_COST_DEFAULTS = types.MappingProxyType({
+    'Vodka': 150.0,
+    'Tequila': 200.0,
+    'Whiskey & Bourbon': 180.0,
+    'Scotch': 250.0,
+    'Champagne': 300.0,
+    'Gin': 140.0,
+    'Rum': 130.0,
+    'Cognac': 350.0,
+})
+
+# Currency formatting stripped from price strings ("$1,200 " -> "1200")
+_CLEAN_RE = re.compile(r'[$,\s]')
+
+# lru_cache needs hashable arguments, so the cost cache lives at module level and is
+# keyed on a per-instance id plus a version that every cost table update bumps.
+# Prices are rounded to cents in the key, so float noise doesn't defeat the cache.
+_instance_ids = itertools.count()
+_instances = weakref.WeakValueDictionary()
+
+
+@lru_cache(maxsize=4096)
+def _get_cost_cached(instance_id: int, version: int, bottle: str, bottle_type: str,
+                     current_price: Optional[float]) -> float:
+    manager = _instances[instance_id]
+    return manager.get_cost_normalized(bottle.lower().strip(), bottle_type, current_price)
 
 
 class CostManager:
@@ -35,9 +78,14 @@ class CostManager:
                              If None, uses default cost estimation.
         """
         self.cost_config_path = Path(cost_config_path) if cost_config_path else None
-        self.product_costs: Dict[str, float] = {}  # bottle_name -> cost
-        self.type_costs: Dict[str, float] = {}     # type -> default cost
-        self.min_profit_margin_pct: float = 0.30   # Default 30% minimum margin
+        # Identity/version for the get_cost cache; bump _version after changing costs
+        self._cache_id = next(_instance_ids)
+        self._version = 0
+        _instances[self._cache_id] = self
+        
+        self._product_costs: Dict[str, float] = {}  # bottle_name -> cost
+        self._type_costs: Dict[str, float] = {}     # type -> default cost
+        self.min_profit_margin_pct: float = 0.30    # Default 30% minimum margin
         
         if self.cost_config_path and self.cost_config_path.exists():
             self.load_costs()
@@ -45,35 +93,65 @@ class CostManager:
             # Initialize with default cost estimation (assumes 40% cost, 60% margin)
             self.use_default_costs = True
     
+    @property
+    def product_costs(self) -> Mapping[str, float]:
+        """Read-only view of bottle_name -> cost; change it with set_product_cost or by assignment."""
+        return types.MappingProxyType(self._product_costs)
+    
+    @product_costs.setter
+    def product_costs(self, costs: Dict[str, float]):
+        self._product_costs = {sys.intern(k.lower().strip()): float(v) for k, v in costs.items()}
+        self._version += 1
+    
+    @property
+    def type_costs(self) -> Mapping[str, float]:
+        """Read-only view of type -> default cost; change it with set_type_cost or by assignment."""
+        return types.MappingProxyType(self._type_costs)
+    
+    @type_costs.setter
+    def type_costs(self, costs: Dict[str, float]):
+        self._type_costs = {sys.intern(k): float(v) for k, v in costs.items()}
+        self._version += 1
+    
+    def set_product_cost(self, bottle: str, cost: float):
+        """Set the cost of one bottle (invalidates cached get_cost results)."""
+        self._product_costs[sys.intern(bottle.lower().strip())] = float(cost)
+        self._version += 1
+    
+    def set_type_cost(self, bottle_type: str, cost: float):
+        """Set the default cost of one type (invalidates cached get_cost results)."""
+        self._type_costs[sys.intern(bottle_type)] = float(cost)
+        self._version += 1
+    
     def load_costs(self):
         """Load costs from JSON configuration file."""
         try:
-            with open(self.cost_config_path, 'r') as f:
-                config = json.load(f)
+            if ORJSON_AVAILABLE:
+                config = orjson.loads(self.cost_config_path.read_bytes())
+            else:
+                with open(self.cost_config_path, 'r') as f:
+                    config = json.load(f)
             
-            # Load product-specific costs
+            # Load product-specific costs (the setter normalizes and interns keys once,
+            # so lookups compare interned strings instead of rehashing fresh ones)
             if 'product_costs' in config:
-                self.product_costs = {
-                    k.lower().strip(): float(v) 
-                    for k, v in config['product_costs'].items()
-                }
+                self.product_costs = config['product_costs']
             
             # Load type-based default costs
             if 'type_costs' in config:
-                self.type_costs = {
-                    k: float(v) 
-                    for k, v in config['type_costs'].items()
-                }
+                self.type_costs = config['type_costs']
             
             # Load minimum profit margin
             if 'min_profit_margin_pct' in config:
                 self.min_profit_margin_pct = float(config['min_profit_margin_pct'])
             
             self.use_default_costs = False
+            self._version += 1
             print(f"Loaded cost configuration from {self.cost_config_path}")
         except Exception as e:
             print(f"Warning: Could not load cost config: {e}. Using default cost estimation.")
             self.use_default_costs = True
+            self._version += 1
     
     def get_cost(self, bottle: str, bottle_type: str, current_price: Optional[float] = None) -> float:
         """
@@ -87,33 +165,35 @@ class CostManager:
         Returns:
             Cost of the product
         """
-        bottle_norm = bottle.lower().strip()
+        # Memoized: catalogs repeat the same (bottle, type, price) lookups constantly
+        if current_price is not None:
+            current_price = round(float(current_price), 2)
+        return _get_cost_cached(self._cache_id, self._version, bottle, bottle_type, current_price)
+    
+    def get_cost_normalized(self, bottle_key: str, bottle_type: str, current_price: Optional[float] = None) -> float:
+        """
+        Fast path for get_cost when the caller already holds the normalized key.
         
+        Args:
+            bottle_key: Bottle name already lowercased and stripped (ideally sys.intern'd)
+            bottle_type: Alcohol type
+            current_price: Current selling price (used for default estimation)
+        """
         # Try product-specific cost first
-        if bottle_norm in self.product_costs:
-            return self.product_costs[bottle_norm]
+        cost = self._product_costs.get(bottle_key)
+        if cost is not None:
+            return cost
         
         # Try type-based default cost
-        if bottle_type in self.type_costs:
-            return self.type_costs[bottle_type]
+        if bottle_type in self._type_costs:
+            return self._type_costs[bottle_type]
         
         # Fallback: estimate from current price (assume 40% cost, 60% margin)
         if current_price and self.use_default_costs:
             return current_price * 0.40
         
         # Ultimate fallback: use type-based median estimation
-        # This is a rough estimate - should be replaced with actual cost data
-        type_cost_defaults = {
-            'Vodka': 150.0,
-            'Tequila': 200.0,
-            'Whiskey & Bourbon': 180.0,
-            'Scotch': 250.0,
-            'Champagne': 300.0,
-            'Gin': 140.0,
-            'Rum': 130.0,
-            'Cognac': 350.0,
-        }
-        return type_cost_defaults.get(bottle_type, 175.0)
+        return _TYPE_COST_DEFAULTS.get(bottle_type, 175.0)
     
     def calculate_profit(self, price: float, cost: float) -> float:
         """Calculate profit (price - cost)."""
@@ -159,13 +239,18 @@ class CostManager:
     def save_costs(self, output_path: str):
         """Save current cost configuration to JSON file."""
         config = {
-            'product_costs': self.product_costs,
-            'type_costs': self.type_costs,
+            'product_costs': self._product_costs,
+            'type_costs': self._type_costs,
             'min_profit_margin_pct': self.min_profit_margin_pct
         }
         
-        with open(output_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        if ORJSON_AVAILABLE:
+            Path(output_path).write_bytes(
+                orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            )
+        else:
+            with open(output_path, 'w') as f:
+                json.dump(config, f, indent=2)
         
         print(f"Cost configuration saved to {output_path}")
     
@@ -182,44 +267,27 @@ class CostManager:
         """
         print(f"Estimating costs assuming {margin_pct*100:.0f}% profit margin...")
         
-        # Estimate costs for each product
-        for _, row in df.iterrows():
-            bottle = row.get('bottle', '')
-            bottle_type = row.get('type', '')
-            price = float(row.get('price', 0))
-            
-            try:
-                # Handle price as string (remove $, commas, etc.)
-                if isinstance(price, str):
-                    price = price.replace('$', '').replace(',', '').strip()
-                price = float(price)
-                
-                if price > 0:
-                    estimated_cost = price * (1 - margin_pct)
-                    bottle_norm = bottle.lower().strip()
-                    
-                    # Store if not already set
-                    if bottle_norm not in self.product_costs:
-                        self.product_costs[bottle_norm] = estimated_cost
-            except (ValueError, TypeError):
-                continue  # Skip invalid prices
-        
-        # Calculate type medians for defaults
-        for bottle_type in df['type'].unique():
-            type_rows = df[df['type'] == bottle_type]['price']
-            type_prices = []
-            for price_val in type_rows:
-                try:
-                    if isinstance(price_val, str):
-                        price_val = price_val.replace('$', '').replace(',', '').strip()
-                    type_prices.append(float(price_val))
-                except (ValueError, TypeError):
-                    continue
-            
-            if len(type_prices) > 0:
-                import numpy as np
-                type_median_price = np.median(type_prices)
-                self.type_costs[bottle_type] = type_median_price * (1 - margin_pct)
+        # Parse prices in one vectorized pass (handles "$1,200"-style strings)
+        cleaned = df['price'].astype(str).str.replace(_CLEAN_RE, '', regex=True)
+        prices = pd.to_numeric(cleaned, errors='coerce')
+        
+        # Estimate costs for each product (first occurrence wins, existing costs are kept)
+        valid = prices.notna() & (prices > 0)
+        bottles = df.loc[valid, 'bottle'].str.lower().str.strip().map(sys.intern, na_action='ignore')
+        estimated = pd.Series((prices[valid] * (1 - margin_pct)).to_numpy(), index=bottles.to_numpy())
+        estimated = estimated[~estimated.index.duplicated(keep='first')]
+        estimated = estimated[~estimated.index.isin(list(self._product_costs))]
+        self._product_costs.update(estimated.to_dict())
+        
+        # Calculate type medians for defaults (types in order of first appearance)
+        parsed = prices.notna()
+        type_codes, type_names = pd.factorize(df.loc[parsed, 'type'])
+        has_type = type_codes >= 0
+        type_medians = group_medians(type_codes[has_type], prices[parsed].to_numpy()[has_type], len(type_names))
+        self._type_costs.update({
+            sys.intern(str(k)): float(v) for k, v in zip(type_names, type_medians * (1 - margin_pct))
+        })
+        self._version += 1
         
         print(f"Estimated costs for {len(self.product_costs)} products")
         print(f"Estimated costs for {len(self.type_costs)} types")
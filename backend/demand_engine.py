@@ -7,14 +7,69 @@ pricing to maximize revenue = price × predicted_demand.
 
 import pandas as pd
 import numpy as np
+from dataclasses import asdict, dataclass
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import joblib
+import json
 import os
+from functools import lru_cache
 from pathlib import Path
+from model_kernel import compile_booster
+
+
+def _clean(value: str) -> str:
+    """
+    Normalize a category value for use in a one-hot column name.
+    
+    Shared by training-time encoding and prediction-time lookup so the two
+    always produce the same column names.
+    """
+    return value.replace(' ', '_').replace('&', '').replace("'", '').replace('-', '_').replace('+', '_')
+
+
+@dataclass(frozen=True, slots=True)
+class DemandContext:
+    """
+    Demand conditions shared by every product in a batch (time, event, inventory).
+    
+    Build it once per batch with resolve() so time defaults are looked up once,
+    not per product.
+    """
+    day_of_week: int
+    hour: int
+    is_weekend: bool
+    is_holiday: bool = False
+    event_type: str = 'regular'
+    inventory_level: float = 1.0
+    month: int = 1
+    
+    @classmethod
+    def resolve(
+        cls,
+        day_of_week: int = None,
+        hour: int = None,
+        is_weekend: bool = None,
+        is_holiday: bool = False,
+        event_type: str = 'regular',
+        inventory_level: float = 1.0,
+        month: int = None
+    ) -> 'DemandContext':
+        """Fill unset time fields from the current time, as optimize_price does."""
+        if day_of_week is None or hour is None or month is None:
+            now = datetime.now()
+            if day_of_week is None:
+                day_of_week = now.weekday()
+            if hour is None:
+                hour = now.hour
+            if month is None:
+                month = now.month
+        if is_weekend is None:
+            is_weekend = day_of_week >= 4  # Fri, Sat, Sun
+        return cls(day_of_week, hour, is_weekend, is_holiday, event_type, inventory_level, month)
 
 
 class DemandPredictionModel:
@@ -22,10 +77,73 @@ class DemandPredictionModel:
     XGBoost model to predict bottles sold given price and contextual features.
     """
     
-    def __init__(self):
+    # Numeric (non one-hot) model inputs, in training order
+    NUMERIC_FEATURES = [
+        'price', 'day_of_week', 'hour', 'is_weekend', 'is_holiday',
+        'inventory_level', 'month'
+    ]
+    
+    # Up to this many rows the compiled tree kernel beats XGBoost's per-call
+    # overhead; larger batches go to XGBoost's own (blocked) predictor
+    COMPILED_MAX_ROWS = 512
+    
+    def __init__(self, device: str = "auto"):
+        """
+        Args:
+            device: XGBoost training device: "auto" (CUDA when available), "cuda" or "cpu"
+        """
+        self.device = device
         self.model = None
         self.feature_names = None
         self.is_trained = False
+        self._feat_idx: Dict[str, int] = {}
+        self._onehot_idx: Dict[Tuple[str, str], Optional[int]] = {}
+        self._booster = None
+        self._iteration_range = (0, 0)
+        self._compiled = None
+        self._version = 0  # Bumped whenever the underlying model changes
+    
+    def _training_device(self) -> str:
+        """Resolve the configured device, using CUDA only if XGBoost was built with it and a GPU is visible."""
+        if self.device != "auto":
+            return self.device
+        try:
+            has_cuda = bool(xgb.build_info().get('USE_CUDA'))
+        except Exception:
+            has_cuda = False
+        visible = os.environ.get('CUDA_VISIBLE_DEVICES')
+        if visible is not None and visible.strip() in ('', '-1'):
+            has_cuda = False
+        return "cuda" if has_cuda else "cpu"
+    
+    def _index_features(self):
+        """Map each feature name to its column index (call whenever feature_names changes)."""
+        self._feat_idx = {name: i for i, name in enumerate(self.feature_names)}
+        self._onehot_idx = {}
+    
+    def _onehot_column(self, prefix: str, value: str) -> Optional[int]:
+        """
+        Column index of the one-hot feature for a raw category value (None if unseen).
+        
+        Memoized per (prefix, value), so repeated venues/types/events cost one
+        dict lookup instead of re-cleaning the name on every row.
+        """
+        key = (prefix, value)
+        try:
+            return self._onehot_idx[key]
+        except KeyError:
+            idx = self._onehot_idx[key] = self._feat_idx.get(_clean(f'{prefix}_{value}'))
+            return idx
+    
+    def _cache_booster(self):
+        """Keep the raw booster for inplace_predict (call whenever model changes)."""
+        self._version += 1
+        self._booster = self.model.get_booster()
+        # Same trees sklearn's predict() would use (best iteration after early stopping)
+        best_iteration = getattr(self.model, 'best_iteration', None)
+        self._iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        # Same trees again as node arrays for the Numba kernel (None if unsupported)
+        self._compiled = compile_booster(self._booster, self._iteration_range)
         
     def train(
         self,
@@ -55,48 +173,59 @@ class DemandPredictionModel:
             Dictionary with training metrics
         """
         # Prepare features
-        feature_cols = [
-            'price', 'day_of_week', 'hour', 'is_weekend', 'is_holiday',
-            'inventory_level', 'month'
-        ]
+        numeric_cols = [f for f in self.NUMERIC_FEATURES if f in df.columns]
         
-        # One-hot encode categorical features
+        # One-hot encode categorical features straight into uint8 blocks
+        # (factorize + scatter; sorted categories give get_dummies' column order)
         categorical_cols = ['venue', 'type', 'event_type']
-        df_encoded = df.copy()
+        blocks = [df[numeric_cols].to_numpy(dtype=np.float32)]
+        onehot_cols = []
         
         for col in categorical_cols:
             if col in df.columns:
-                dummies = pd.get_dummies(df[col], prefix=col, drop_first=False)
+                codes, uniques = pd.factorize(df[col], sort=True)
+                onehot = np.zeros((len(df), len(uniques)), dtype=np.uint8)
+                present = codes >= 0  # Missing values get no column, as with get_dummies
+                onehot[np.flatnonzero(present), codes[present]] = 1
+                blocks.append(onehot)
                 # Clean column names (replace spaces, special chars) to match prediction
-                dummies.columns = [c.replace(' ', '_').replace('&', '').replace("'", '').replace('-', '_').replace('+', '_') for c in dummies.columns]
-                df_encoded = pd.concat([df_encoded, dummies], axis=1)
-                feature_cols.extend(dummies.columns.tolist())
+                onehot_cols.extend(_clean(f'{col}_{u}') for u in uniques)
         
-        # Filter to available features
-        available_features = [f for f in feature_cols if f in df_encoded.columns]
+        # One contiguous float32 matrix, no intermediate DataFrames
+        X = np.hstack(blocks).astype(np.float32, copy=False)
+        y = df[target_col].to_numpy(dtype=np.float32)  # XGBoost stores labels as float32 anyway
         
-        X = df_encoded[available_features]
-        y = df_encoded[target_col]
-        
-        self.feature_names = available_features
+        self.feature_names = numeric_cols + onehot_cols
+        self._index_features()
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=random_state
         )
         
-        # Train XGBoost model
-        self.model = xgb.XGBRegressor(
+        # Train XGBoost model (histogram method on GPU when available; stop once the
+        # held-out error hasn't improved for 20 rounds instead of always growing 100 trees)
+        params = dict(
             n_estimators=100,
             max_depth=6,
             learning_rate=0.1,
             subsample=0.8,
             colsample_bytree=0.8,
             random_state=random_state,
-            n_jobs=-1
+            n_jobs=-1,
+            tree_method="hist",
+            early_stopping_rounds=20
         )
-        
-        self.model.fit(X_train, y_train)
+        device = self._training_device()
+        try:
+            self.model = xgb.XGBRegressor(device=device, **params)
+            self.model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
+        except xgb.core.XGBoostError as e:
+            if device == "cpu":
+                raise
+            print(f"Warning: GPU training failed ({e}). Falling back to CPU.")
+            self.model = xgb.XGBRegressor(device="cpu", **params)
+            self.model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
         
         # Evaluate
         y_pred_train = self.model.predict(X_train)
@@ -107,6 +236,7 @@ class DemandPredictionModel:
         train_rmse = np.sqrt(mean_squared_error(y_train, y_pred_train))
         test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
         
+        self._cache_booster()
         self.is_trained = True
         
         metrics = {
@@ -142,88 +272,195 @@ class DemandPredictionModel:
         Returns:
             Predicted number of bottles sold (non-negative)
         """
+        prediction = self.predict_batch(
+            np.array([price]),
+            venue=venue,
+            bottle=bottle,
+            bottle_type=bottle_type,
+            day_of_week=day_of_week,
+            hour=hour,
+            is_weekend=is_weekend,
+            is_holiday=is_holiday,
+            event_type=event_type,
+            inventory_level=inventory_level,
+            month=month
+        )[0]
+        
+        # Convert to native Python float (already non-negative)
+        return float(prediction)
+    
+    def predict_batch(
+        self,
+        prices: np.ndarray,
+        venue: str,
+        bottle: str,
+        bottle_type: str,
+        day_of_week: int = None,
+        hour: int = None,
+        is_weekend: bool = None,
+        is_holiday: bool = False,
+        event_type: str = 'regular',
+        inventory_level: float = 1.0,
+        month: int = None
+    ) -> np.ndarray:
+        """
+        Predict bottles sold at each of several prices under the same conditions.
+        
+        Equivalent to calling predict() once per price, but builds a single
+        (n_prices, n_features) matrix and runs the model once.
+        
+        Returns:
+            Array of predicted bottles sold (non-negative), one per price
+        """
+        return self._predict_matrix(self._feature_matrix(
+            prices,
+            venue=venue,
+            bottle=bottle,
+            bottle_type=bottle_type,
+            day_of_week=day_of_week,
+            hour=hour,
+            is_weekend=is_weekend,
+            is_holiday=is_holiday,
+            event_type=event_type,
+            inventory_level=inventory_level,
+            month=month
+        ))
+    
+    def local_elasticity(self, price: float, rel_step: float = 0.05, **context) -> float:
+        """
+        Price elasticity of predicted demand, (dQ/dp) * (p/Q), at the given price.
+        
+        Estimated from two predictions at price * (1 ± rel_step) under the same
+        conditions (predict keyword arguments). Tree models are piecewise
+        constant, so a small step can land in one leaf and report 0.
+        
+        Returns:
+            Elasticity (normally negative), or NaN when demand there is zero
+        """
+        low, high = self.predict_batch(np.array([price * (1 - rel_step), price * (1 + rel_step)]), **context)
+        demand = (low + high) / 2
+        if demand <= 0:
+            return float('nan')
+        return float((high - low) / (2 * price * rel_step) * price / demand)
+    
+    def _feature_matrix(
+        self,
+        prices: np.ndarray,
+        venue: str,
+        bottle: str,
+        bottle_type: str,
+        day_of_week: int = None,
+        hour: int = None,
+        is_weekend: bool = None,
+        is_holiday: bool = False,
+        event_type: str = 'regular',
+        inventory_level: float = 1.0,
+        month: int = None
+    ) -> np.ndarray:
+        """Model input rows for predict_batch: one float32 row per price."""
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
         
         # Set defaults
-        if day_of_week is None:
-            day_of_week = datetime.now().weekday()
-        if hour is None:
-            hour = datetime.now().hour
+        if day_of_week is None or hour is None or month is None:
+            now = datetime.now()
+            if day_of_week is None:
+                day_of_week = now.weekday()
+            if hour is None:
+                hour = now.hour
+            if month is None:
+                month = now.month
         if is_weekend is None:
             is_weekend = day_of_week >= 4  # Fri, Sat, Sun
-        if month is None:
-            month = datetime.now().month
-        
-        # Create feature vector
-        features = pd.DataFrame({
-            'price': [price],
-            'day_of_week': [day_of_week],
-            'hour': [hour],
-            'is_weekend': [1 if is_weekend else 0],
-            'is_holiday': [1 if is_holiday else 0],
-            'inventory_level': [inventory_level],
-            'month': [month]
-        })
-        
-        # Add one-hot encoded categorical features
-        # First, create all categorical feature columns and set to 0
-        for feature_name in self.feature_names:
-            if feature_name.startswith('venue_') or feature_name.startswith('type_') or feature_name.startswith('event_type_'):
-                if feature_name not in features.columns:
-                    features[feature_name] = [0]
-        
-        # Then set the appropriate ones to 1
-        # Clean the input values to match how get_dummies processes them
-        venue_clean = venue.replace(' ', '_').replace('&', '').replace("'", '').replace('-', '_')
-        type_clean = bottle_type.replace(' ', '_').replace('&', '').replace("'", '').replace('-', '_')
-        event_clean = event_type.replace(' ', '_').replace('&', '').replace("'", '').replace('-', '_')
-        
-        for feature_name in self.feature_names:
-            if feature_name.startswith('venue_'):
-                # Match venue name (handle spaces and special chars)
-                if feature_name == f'venue_{venue_clean}':
-                    features[feature_name] = [1]
-            elif feature_name.startswith('type_'):
-                if feature_name == f'type_{type_clean}':
-                    features[feature_name] = [1]
-            elif feature_name.startswith('event_type_'):
-                if feature_name == f'event_type_{event_clean}':
-                    features[feature_name] = [1]
-        
-        # Ensure all features are present
-        for feature_name in self.feature_names:
-            if feature_name not in features.columns:
-                features[feature_name] = [0]
-        
-        # Reorder columns to match training
-        features = features[self.feature_names]
-        
-        # Predict
-        prediction = self.model.predict(features)[0]
-        
-        # Ensure non-negative and convert to native Python float
-        return float(max(0.0, float(prediction)))
+        
+        # Every row shares the context features, so fill one template row and
+        # broadcast it; only the price column varies
+        template = np.zeros(len(self.feature_names), dtype=np.float32)
+        numeric_values = {
+            'day_of_week': day_of_week,
+            'hour': hour,
+            'is_weekend': 1 if is_weekend else 0,
+            'is_holiday': 1 if is_holiday else 0,
+            'inventory_level': inventory_level,
+            'month': month
+        }
+        for name, value in numeric_values.items():
+            idx = self._feat_idx.get(name)
+            if idx is not None:
+                template[idx] = value
+        
+        # One-hot columns: unknown categories leave every column of that group at 0
+        for prefix, value in (('venue', venue), ('type', bottle_type), ('event_type', event_type)):
+            idx = self._onehot_column(prefix, value)
+            if idx is not None:
+                template[idx] = 1
+        
+        prices = np.asarray(prices, dtype=np.float32)
+        X = np.broadcast_to(template, (len(prices), template.size)).copy()
+        X[:, self._feat_idx['price']] = prices
+        
+        return X
+    
+    def _predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Predicted bottles sold (non-negative) for rows built by _feature_matrix."""
+        if self._compiled is not None and len(X) <= self.COMPILED_MAX_ROWS:
+            # Single products / small sweeps: compiled kernel, identical float32 results
+            predictions = self._compiled.predict(X)
+        else:
+            # inplace_predict skips the DMatrix the sklearn wrapper would build per call
+            predictions = self._booster.inplace_predict(X, iteration_range=self._iteration_range)
+        return np.maximum(predictions.astype(np.float64), 0.0)
+    
+    @staticmethod
+    def _native_paths(filepath: str) -> Tuple[str, str]:
+        """XGBoost UBJ model file and feature-name sidecar stored next to `filepath`."""
+        base = os.path.splitext(filepath)[0]
+        return base + '.ubj', base + '.features.json'
+    
+    @classmethod
+    def saved_model_exists(cls, filepath: str) -> bool:
+        """True if load(filepath) will find a model (native format or legacy joblib)."""
+        return os.path.exists(cls._native_paths(filepath)[0]) or os.path.exists(filepath)
     
     def save(self, filepath: str):
-        """Save model to file."""
+        """
+        Save model to file.
+        
+        Writes XGBoost's native UBJ format (`<name>.ubj`) plus the feature names
+        (`<name>.features.json`) next to `filepath`; compact and portable across
+        XGBoost versions, unlike pickling the sklearn wrapper.
+        """
         if not self.is_trained:
             raise ValueError("Model not trained. Cannot save.")
         
-        model_data = {
-            'model': self.model,
-            'feature_names': self.feature_names
-        }
-        joblib.dump(model_data, filepath)
-        print(f"Model saved to {filepath}")
+        model_path, features_path = self._native_paths(filepath)
+        self.model.save_model(model_path)
+        with open(features_path, 'w') as f:
+            json.dump(self.feature_names, f)
+        print(f"Model saved to {model_path}")
     
     def load(self, filepath: str):
-        """Load model from file."""
-        model_data = joblib.load(filepath)
-        self.model = model_data['model']
-        self.feature_names = model_data['feature_names']
+        """
+        Load model from file.
+        
+        Prefers the native files written by save(); falls back to a legacy
+        joblib pickle at `filepath`.
+        """
+        model_path, features_path = self._native_paths(filepath)
+        if os.path.exists(model_path):
+            self.model = xgb.XGBRegressor()
+            self.model.load_model(model_path)
+            with open(features_path) as f:
+                self.feature_names = json.load(f)
+        else:
+            model_data = joblib.load(filepath)
+            self.model = model_data['model']
+            self.feature_names = model_data['feature_names']
+            model_path = filepath
+        self._index_features()
+        self._cache_booster()
         self.is_trained = True
-        print(f"Model loaded from {filepath}")
+        print(f"Model loaded from {model_path}")
 
 
 class PriceOptimizer:
@@ -234,9 +471,16 @@ class PriceOptimizer:
     Otherwise, optimizes revenue = price × predicted_demand(price).
     """
     
+    # Inventory levels are snapped to this step so nearby requests share cache entries
+    INVENTORY_STEP = 0.05
+    
+    # Accepted optimize_price(search=...) values
+    SEARCH_METHODS = ('grid', 'elasticity')
+    
     def __init__(self, demand_model: DemandPredictionModel, cost_manager=None):
         self.demand_model = demand_model
         self.cost_manager = cost_manager
+        self._optimize_cached = lru_cache(maxsize=4096)(self._optimize_price)
     
     def optimize_price(
         self,
@@ -253,14 +497,170 @@ class PriceOptimizer:
         is_holiday: bool = False,
         event_type: str = 'regular',
         inventory_level: float = 1.0,
-        month: int = None
+        month: int = None,
+        search: str = 'grid'
     ) -> Dict:
         """
         Find optimal price that maximizes profit (if cost_manager available) or revenue.
         
+        search='grid' evaluates every price_step between the bounds.
+        search='elasticity' solves the constant-elasticity profit optimum
+        p* = cost * e / (1 + e) from the local elasticity e at the current price
+        (needs a known cost and elastic demand, e < -1; otherwise it falls back
+        to the grid), so price_range holds only p* and the current price. It is
+        a cheap approximation: the learned demand curve is not constant-elasticity,
+        so it usually finds less profit than the grid, which stays the default.
+        
+        Results are memoized per context until the demand model or cost table
+        changes. The search runs on the normalized cache key, not the raw
+        arguments: the current price is rounded to cents and inventory_level is
+        snapped to INVENTORY_STEP, so every call in an inventory bucket gets the
+        result computed at the bucket's level (0.13 is priced as 0.15).
+        optimize_prices_batch prices the exact values.
+        
         Returns:
             Dictionary with optimal price, predicted demand, revenue, profit, and alternatives
         """
+        if search not in self.SEARCH_METHODS:
+            raise ValueError(f"search must be one of {self.SEARCH_METHODS}, got {search!r}")
+        result = self._optimize_cached(*self._context_key(
+            venue, bottle, bottle_type, current_price, min_price, max_price, price_step,
+            day_of_week, hour, is_weekend, is_holiday, event_type, inventory_level, month
+        ), search=search)
+        # Copy down to the price_range rows so callers can't alter the cached entry
+        result = dict(result)
+        if 'price_range' in result:
+            result['price_range'] = [dict(row) for row in result['price_range']]
+        return result
+    
+    def optimize_prices_batch(self, skus: List[Dict], context: Optional[DemandContext] = None) -> List[Dict]:
+        """
+        Grid-search optimal prices for many products with a single model call.
+        
+        Each sku is a dict of optimize_price keyword arguments (venue, bottle,
+        bottle_type, current_price and any optional demand conditions). When
+        the demand conditions are the same for every product, pass them once
+        as context instead. The price sweeps of all products are stacked into
+        one feature matrix, so a full-catalog reprice costs one booster call
+        instead of one per product. The batch is not cached, so products are
+        priced at their exact current price and inventory level.
+        
+        Returns:
+            One optimize_price-style result per sku, in the same order
+        """
+        shared = asdict(context) if context is not None else {}
+        results = [None] * len(skus)
+        blocks = []
+        pending = []
+        for i, sku in enumerate(skus):
+            # Exact inputs: the rounding in _context_key only serves optimize_price's cache
+            context = self._resolve_context(**sku, **shared)
+            current_price = context[3]
+            cost, prices, features = self._candidates(*context)
+            if prices is None:
+                results[i] = self._no_prices_result(current_price, cost)
+                continue
+            blocks.append(self.demand_model._feature_matrix(np.append(prices, current_price), **features))
+            pending.append((i, current_price, cost, prices))
+        
+        if blocks:
+            demand = self.demand_model._predict_matrix(np.vstack(blocks))
+            boundaries = np.cumsum([len(block) for block in blocks])[:-1]
+            for (i, current_price, cost, prices), sku_demand in zip(pending, np.split(demand, boundaries)):
+                results[i] = self._summarize(current_price, cost, prices, sku_demand[:-1], float(sku_demand[-1]))
+        
+        return results
+    
+    def _resolve_context(
+        self,
+        venue: str,
+        bottle: str,
+        bottle_type: str,
+        current_price: float,
+        min_price: float = None,
+        max_price: float = None,
+        price_step: float = 5.0,
+        day_of_week: int = None,
+        hour: int = None,
+        is_weekend: bool = None,
+        is_holiday: bool = False,
+        event_type: str = 'regular',
+        inventory_level: float = 1.0,
+        month: int = None
+    ) -> Tuple:
+        """
+        optimize_price arguments in _candidates order, with time defaults resolved.
+        """
+        if day_of_week is None or hour is None or is_weekend is None or month is None:
+            # Only look at the clock when a time default is actually needed
+            resolved = DemandContext.resolve(day_of_week=day_of_week, hour=hour, is_weekend=is_weekend, month=month)
+            day_of_week, hour, is_weekend, month = resolved.day_of_week, resolved.hour, resolved.is_weekend, resolved.month
+        return (
+            venue, bottle, bottle_type, float(current_price), min_price, max_price, price_step,
+            int(day_of_week), int(hour), bool(is_weekend), bool(is_holiday), event_type,
+            float(inventory_level), int(month)
+        )
+    
+    def _context_key(self, *args, **kwargs) -> Tuple:
+        """
+        optimize_price cache key: the resolved context with the current price
+        rounded to cents and the inventory level snapped to INVENTORY_STEP,
+        prefixed with model and cost versions.
+        """
+        (venue, bottle, bottle_type, current_price, min_price, max_price, price_step,
+         day_of_week, hour, is_weekend, is_holiday, event_type, inventory_level, month) = self._resolve_context(*args, **kwargs)
+        inventory_level = round(round(inventory_level / self.INVENTORY_STEP) * self.INVENTORY_STEP, 2)
+        
+        cost_key = None
+        if self.cost_manager:
+            cost_key = (getattr(self.cost_manager, '_version', None), self.cost_manager.min_profit_margin_pct)
+        
+        return (
+            getattr(self.demand_model, '_version', None), cost_key,
+            venue, bottle, bottle_type, round(current_price, 2), min_price, max_price, price_step,
+            day_of_week, hour, is_weekend, is_holiday, event_type, inventory_level, month
+        )
+    
+    def _optimize_price(self, model_version, cost_key, *context, search: str = 'grid') -> Dict:
+        """
+        Price search behind optimize_price (memoized by _optimize_cached).
+        
+        context is the rest of a _context_key tuple; model_version / cost_key
+        only distinguish cache entries.
+        """
+        current_price = context[3]
+        cost, prices, predict_kwargs = self._candidates(*context, search=search)
+        if prices is None:
+            return self._no_prices_result(current_price, cost)
+        
+        # One batched prediction for every candidate price, with the current
+        # price folded in as the last row
+        demand = self.demand_model.predict_batch(np.append(prices, current_price), **predict_kwargs)
+        return self._summarize(current_price, cost, prices, demand[:-1], float(demand[-1]))
+    
+    def _candidates(
+        self,
+        venue: str,
+        bottle: str,
+        bottle_type: str,
+        current_price: float,
+        min_price: Optional[float],
+        max_price: Optional[float],
+        price_step: float,
+        day_of_week: int,
+        hour: int,
+        is_weekend: bool,
+        is_holiday: bool,
+        event_type: str,
+        inventory_level: float,
+        month: int,
+        search: str = 'grid'
+    ) -> Tuple[Optional[float], Optional[np.ndarray], Dict]:
+        """
+        Cost, candidate prices and demand-model keyword arguments for one product.
+        
+        Candidate prices are None when no price in range can be profitable.
+        """
         # Get cost if cost manager available
         cost = None
         if self.cost_manager:
@@ -275,133 +675,93 @@ class PriceOptimizer:
         if max_price is None:
             max_price = current_price * 1.5  # 50% increase max
         
+        context = dict(
+            venue=venue,
+            bottle=bottle,
+            bottle_type=bottle_type,
+            day_of_week=day_of_week,
+            hour=hour,
+            is_weekend=is_weekend,
+            is_holiday=is_holiday,
+            event_type=event_type,
+            inventory_level=inventory_level,
+            month=month
+        )
+        
         # Adjust min_price to ensure profitability if cost_manager available
         if self.cost_manager and cost is not None:
             min_profit_price = self.cost_manager.get_minimum_price(cost)
+            if min_profit_price > max_price:
+                # Every price in range is below the profit floor - no need to ask the model
+                return cost, None, context
             min_price = max(min_price, min_profit_price)
         
-        # Grid search over price range
-        price_range = np.arange(min_price, max_price + price_step, price_step)
-        results = []
-        
-        for price in price_range:
-            predicted_demand = self.demand_model.predict(
-                price=price,
-                venue=venue,
-                bottle=bottle,
-                bottle_type=bottle_type,
-                day_of_week=day_of_week,
-                hour=hour,
-                is_weekend=is_weekend,
-                is_holiday=is_holiday,
-                event_type=event_type,
-                inventory_level=inventory_level,
-                month=month
-            )
-            
-            revenue = price * predicted_demand
-            
-            # Calculate profit if cost available
-            if cost is not None:
-                profit = (price - cost) * predicted_demand
-                profit_margin = self.cost_manager.calculate_profit_margin(price, cost)
-                # Only consider profitable prices
-                if profit_margin >= self.cost_manager.min_profit_margin_pct * 100:
-                    results.append({
-                        'price': price,
-                        'predicted_demand': predicted_demand,
-                        'revenue': revenue,
-                        'profit': profit,
-                        'profit_margin_pct': profit_margin,
-                        'cost': cost
-                    })
-            else:
-                results.append({
-                    'price': price,
-                    'predicted_demand': predicted_demand,
-                    'revenue': revenue
-                })
-        
-        if not results:
+        prices = None
+        if search == 'elasticity' and cost is not None and min_price < max_price:
+            prices = self._elasticity_optimum(current_price, min_price, max_price, price_step, cost, context)
+        if prices is None:
+            # Grid search over price range
+            prices = np.arange(min_price, max_price + price_step, price_step)
+        return cost, prices, context
+    
+    def _summarize(
+        self,
+        current_price: float,
+        cost: Optional[float],
+        prices: np.ndarray,
+        predicted_demand: np.ndarray,
+        current_demand: float
+    ) -> Dict:
+        """Pick the best candidate price and build the optimize_price result."""
+        revenue = prices * predicted_demand
+        
+        columns = {'price': prices, 'predicted_demand': predicted_demand, 'revenue': revenue}
+        if cost is not None:
+            # Calculate profit and only consider profitable prices
+            profit = (prices - cost) * predicted_demand
+            with np.errstate(divide='ignore', invalid='ignore'):
+                profit_margin = np.where(prices > 0, (prices - cost) / prices * 100, 0.0)
+            profitable = profit_margin >= self.cost_manager.min_profit_margin_pct * 100
+            columns = {
+                'price': prices[profitable],
+                'predicted_demand': predicted_demand[profitable],
+                'revenue': revenue[profitable],
+                'profit': profit[profitable],
+                'profit_margin_pct': profit_margin[profitable],
+                'cost': np.full(profitable.sum(), cost, dtype=np.float64)
+            }
+        
+        if len(columns['price']) == 0:
             # No profitable prices found, return current price info
-            if cost is not None:
-                return {
-                    'optimal_price': current_price,
-                    'optimal_demand': 0,
-                    'optimal_revenue': 0,
-                    'optimal_profit': 0,
-                    'current_price': current_price,
-                    'current_demand': 0,
-                    'current_revenue': 0,
-                    'current_profit': 0,
-                    'error': 'No profitable prices found. Current price may be below cost.',
-                    'cost': float(cost),
-                    'min_profit_price': float(self.cost_manager.get_minimum_price(cost))
-                }
-            else:
-                return {
-                    'optimal_price': current_price,
-                    'optimal_demand': 0,
-                    'optimal_revenue': 0,
-                    'current_price': current_price,
-                    'current_demand': 0,
-                    'current_revenue': 0,
-                    'error': 'No valid prices found'
-                }
-        
-        results_df = pd.DataFrame(results)
+            return self._no_prices_result(current_price, cost)
         
         # Find optimal price - maximize profit if cost available, otherwise revenue
-        if cost is not None and 'profit' in results_df.columns:
-            optimal_idx = results_df['profit'].idxmax()
+        if cost is not None:
+            optimal_idx = int(np.argmax(columns['profit']))
             optimize_for = 'profit'
         else:
-            optimal_idx = results_df['revenue'].idxmax()
+            optimal_idx = int(np.argmax(columns['revenue']))
             optimize_for = 'revenue'
         
-        optimal = results_df.iloc[optimal_idx]
-        
         # Get current revenue for comparison
-        current_demand = self.demand_model.predict(
-            price=current_price,
-            venue=venue,
-            bottle=bottle,
-            bottle_type=bottle_type,
-            day_of_week=day_of_week,
-            hour=hour,
-            is_weekend=is_weekend,
-            is_holiday=is_holiday,
-            event_type=event_type,
-            inventory_level=inventory_level,
-            month=month
-        )
         current_revenue = current_price * current_demand
         current_profit = (current_price - cost) * current_demand if cost is not None else None
         
         # Convert all values to native Python types
-        optimal_price = float(optimal['price'])
-        optimal_demand = float(optimal['predicted_demand'])
-        optimal_revenue = float(optimal['revenue'])
-        optimal_profit = float(optimal.get('profit', optimal_revenue))
-        optimal_profit_margin = float(optimal.get('profit_margin_pct', 0))
+        optimal_price = float(columns['price'][optimal_idx])
+        optimal_demand = float(columns['predicted_demand'][optimal_idx])
+        optimal_revenue = float(columns['revenue'][optimal_idx])
+        optimal_profit = float(columns['profit'][optimal_idx]) if cost is not None else optimal_revenue
+        optimal_profit_margin = float(columns['profit_margin_pct'][optimal_idx]) if cost is not None else 0.0
         current_demand_float = float(current_demand)
         current_revenue_float = float(current_revenue)
         current_profit_float = float(current_profit) if current_profit is not None else None
         
-        # Convert price_range records - ensure all values are native Python types
-        price_range_records = []
-        for rec in results_df.to_dict('records'):
-            clean_rec = {}
-            for k, v in rec.items():
-                # Only convert scalar numeric types, not arrays
-                if isinstance(v, (int, float, np.integer, np.floating)):
-                    clean_rec[k] = float(v)
-                elif isinstance(v, np.ndarray):
-                    # Should not happen, but handle it
-                    clean_rec[k] = float(v.item()) if v.size == 1 else v.tolist()
-                else:
-                    clean_rec[k] = v
-            price_range_records.append(clean_rec)
+        # Price range records as native Python floats (tolist converts whole columns at once)
+        names = list(columns)
+        price_range_records = [
+            dict(zip(names, row)) for row in zip(*(columns[k].tolist() for k in names))
+        ]
         
         result = {
             'optimal_price': optimal_price,
@@ -432,4 +792,61 @@ class PriceOptimizer:
             })
         
         return result
-
+    
+    def _elasticity_optimum(
+        self,
+        current_price: float,
+        min_price: float,
+        max_price: float,
+        price_step: float,
+        cost: float,
+        context: Dict
+    ) -> Optional[np.ndarray]:
+        """
+        Candidate prices for search='elasticity', or None to fall back to the grid.
+        
+        Uses the markup rule p* = cost * e / (1 + e), clipped to the bounds and
+        snapped to the same price_step grid the full search would use. The
+        current price (when in bounds) is kept as a second candidate, so the
+        result is never worse than standing still.
+        """
+        elasticity = self.demand_model.local_elasticity(current_price, **context)
+        if not elasticity < -1:
+            # Inelastic (or zero) demand: no interior optimum, search the grid
+            return None
+        
+        target = min(max(cost * elasticity / (1 + elasticity), min_price), max_price)
+        optimum = min_price + round((target - min_price) / price_step) * price_step
+        if optimum > max_price:
+            optimum -= price_step
+        
+        prices = [optimum]
+        if min_price <= current_price <= max_price and current_price != optimum:
+            prices.append(current_price)
+        return np.sort(np.array(prices, dtype=np.float64))
+    
+    def _no_prices_result(self, current_price: float, cost: Optional[float]) -> Dict:
+        """Result returned when no candidate price qualifies (e.g. all are below cost)."""
+        if cost is not None:
+            return {
+                'optimal_price': current_price,
+                'optimal_demand': 0,
+                'optimal_revenue': 0,
+                'optimal_profit': 0,
+                'current_price': current_price,
+                'current_demand': 0,
+                'current_revenue': 0,
+                'current_profit': 0,
+                'error': 'No profitable prices found. Current price may be below cost.',
+                'cost': float(cost),
+                'min_profit_price': float(self.cost_manager.get_minimum_price(cost))
+            }
+        return {
+            'optimal_price': current_price,
+            'optimal_demand': 0,
+            'optimal_revenue': 0,
+            'current_price': current_price,
+            'current_demand': 0,
+            'current_revenue': 0,
+            'error': 'No valid prices found'
+        }
@@ -14,6 +14,7 @@ backend_path = Path(__file__).parent
 sys.path.insert(0, str(backend_path))
 
 from cost_manager import CostManager
+from venue_csv import read_venue_csv, parse_prices
 
 
 def generate_cost_config(csv_dir: str = ".", output_path: str = "backend/data/cost_config.json"):
@@ -36,17 +37,7 @@ def generate_cost_config(csv_dir: str = ".", output_path: str = "backend/data/co
     
     all_data = []
     for csv_file in csv_files:
-        df = pd.read_csv(csv_file)
-        
-        # Standardize column names
-        if 'Name' in df.columns:
-            df = df.rename(columns={'Name': 'bottle', 'Type of Liquor': 'type', 'Price': 'price'})
-        
-        # Clean price column - remove $ and convert to float
-        if 'price' in df.columns:
-            df['price'] = df['price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-            df['price'] = pd.to_numeric(df['price'], errors='coerce')
-            df = df.dropna(subset=['price'])  # Remove rows with invalid prices
+        df = read_venue_csv(csv_file)
         
         # Extract venue name from filename
         venue_name = csv_file.stem.replace('Drink Pricing - ', '')
@@ -56,6 +47,10 @@ def generate_cost_config(csv_dir: str = ".", output_path: str = "backend/data/co
     
     combined_df = pd.concat(all_data, ignore_index=True)
     
+    # Clean price column once for all venues - remove $ and convert to float
+    combined_df['price'] = parse_prices(combined_df['price'])
+    combined_df = combined_df.dropna(subset=['price'])  # Remove rows with invalid prices
+    
     # Create CostManager and estimate costs
     cost_manager = CostManager()
     
@@ -12,15 +12,145 @@ This creates historical sales data with realistic patterns:
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List
+
+from numba_compat import njit, prange
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+from venue_csv import read_venue_csv, parse_prices
+
+
+PRICE_ELASTICITY = -1.8  # Higher price = lower demand (elasticity around -1.5 to -2.0)
+
+# Event types and their demand multipliers
+EVENT_TYPES = {
+    'regular': 1.0,
+    'DJ': 1.3,
+    'holiday': 1.5,
+    'concert': 1.4,
+    'private_event': 0.8
+}
+EVENT_WEIGHTS = [0.7, 0.15, 0.05, 0.08, 0.02]  # weighted toward regular
+
+# Rows per random-number chunk. Each chunk gets its own Philox stream spawned
+# from the seed, so the output doesn't depend on how many threads draw them.
+CHUNK_ROWS = 100_000
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _simulate_demand(base_prices, day_of_week, hour, event_mult, inventory, month, noise):
+    """
+    Bottles sold per row from the demand formula, one fused pass with no temporaries.
+    
+    Returns:
+        int32 array of non-negative bottle counts
+    """
+    n = base_prices.shape[0]
+    out = np.empty(n, dtype=np.int32)
+    for i in prange(n):
+        # Base demand calculation (simulating price elasticity), normalized to $400
+        demand = 10.0 * (base_prices[i] / 400.0) ** PRICE_ELASTICITY
+        
+        # Weekend multiplier (Fri/Sat stronger)
+        dow = day_of_week[i]
+        if dow == 4 or dow == 5:
+            demand *= 2.5
+        elif dow >= 4:
+            demand *= 1.8
+        
+        # Peak hours (10 PM - 2 AM), then 8-10 PM
+        h = hour[i]
+        if h >= 22 or h <= 2:
+            demand *= 1.5
+        elif h >= 20:
+            demand *= 1.2
+        
+        # Event multiplier
+        demand *= event_mult[i]
+        
+        # Inventory effect (low inventory = slight demand increase due to scarcity)
+        if inventory[i] < 0.2:
+            demand *= 1.1
+        
+        # Month effect (summer months higher: June, July, August, December)
+        m = month[i]
+        if m == 6 or m == 7 or m == 8 or m == 12:
+            demand *= 1.2
+        
+        # Add noise, round to integer (can't sell fractional bottles)
+        demand *= noise[i]
+        out[i] = int(max(0.0, np.rint(demand)))
+    return out
+
+
+def _draw_chunk(rng: np.random.Generator, n: int) -> dict:
+    """Every random input for n rows, drawn from one generator."""
+    is_late_night = rng.random(n) > 0.5
+    return {
+        'random_days': rng.integers(0, 181, size=n),
+        # Generate hour: 18-23 (evening) or 0-2 (late night)
+        'hour': np.where(
+            is_late_night,
+            rng.integers(0, 3, size=n),   # Late night (0-2 AM)
+            rng.integers(18, 24, size=n)  # Evening (6-11 PM)
+        ),
+        'event_codes': rng.choice(len(EVENT_TYPES), size=n, p=EVENT_WEIGHTS),
+        # Inventory level (0-1, where 1 = fully stocked)
+        'inventory_level': rng.uniform(0.1, 1.0, size=n),
+        # Price variation (some days prices change)
+        'price_variation': rng.uniform(0.85, 1.15, size=n),  # ±15% variation
+        'noise': rng.uniform(0.7, 1.3, size=n)
+    }
+
+
+def _draw_inputs(n: int, seed: int = 42, n_jobs: int = None) -> dict:
+    """
+    Random inputs for n rows, drawn in CHUNK_ROWS chunks across threads.
+    
+    NumPy releases the GIL during bulk draws, so chunks fill in parallel.
+    """
+    sizes = [min(CHUNK_ROWS, n - start) for start in range(0, max(n, 1), CHUNK_ROWS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    rngs = [np.random.Generator(np.random.Philox(s)) for s in seeds]
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        chunks = list(pool.map(_draw_chunk, rngs, sizes))
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+
+def write_demand_history(df: pd.DataFrame, output_path: str):
+    """
+    Save demand history as Parquet (".parquet" paths) or CSV.
+    
+    CSV is written with pyarrow's multithreaded writer when it is installed.
+    """
+    if output_path.endswith('.parquet'):
+        df.to_parquet(output_path, engine='pyarrow', compression='snappy', index=False)
+    elif PYARROW_AVAILABLE:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), output_path)
+    else:
+        df.to_csv(output_path, index=False)
+
+
+def load_demand_history(data_path: str) -> pd.DataFrame:
+    """Load demand history written by write_demand_history."""
+    if str(data_path).endswith('.parquet'):
+        return pd.read_parquet(data_path)
+    return pd.read_csv(data_path)
 
 
 def generate_demand_data(
     n_samples: int = 5000,
     venues: List[str] = None,
-    output_path: str = 'backend/data/demand_history.csv'
+    output_path: str = 'backend/data/demand_history.csv',
+    n_jobs: int = None
 ) -> pd.DataFrame:
     """
     Generate synthetic demand/sales history data.
@@ -31,6 +161,10 @@ def generate_demand_data(
     - Peak hours: 10 PM - 2 AM highest demand
     - Events: DJ/holiday events increase demand
     - Inventory: Low inventory signals scarcity, increases demand slightly
+    
+    n_jobs threads draw the random inputs (default: one per CPU); the
+    output is the same for any n_jobs. An output_path ending in ".parquet"
+    saves Parquet instead of CSV.
     """
     
     if venues is None:
@@ -43,22 +177,7 @@ def generate_demand_data(
     for venue in venues:
         csv_file = csv_dir / f"Drink Pricing - {venue}.csv"
         if csv_file.exists():
-            df = pd.read_csv(csv_file)
-            df.columns = df.columns.str.strip()
-            
-            # Map columns
-            col_mapping = {'Name': 'bottle', 'Type of Liquor': 'type', 'Price': 'price'}
-            for old_col, new_col in col_mapping.items():
-                for col in df.columns:
-                    if old_col.lower() in col.lower():
-                        df = df.rename(columns={col: new_col})
-            
-            # Clean price
-            if 'price' in df.columns:
-                df['price'] = df['price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-                df['price'] = pd.to_numeric(df['price'], errors='coerce')
-                df = df.dropna(subset=['price'])
-            
+            df = read_venue_csv(csv_file)
             df['venue'] = venue
             pricing_data.append(df[['venue', 'bottle', 'type', 'price']])
     
@@ -67,16 +186,9 @@ def generate_demand_data(
     
     products_df = pd.concat(pricing_data, ignore_index=True)
     
-    # Event types and their demand multipliers
-    event_types = {
-        'regular': 1.0,
-        'DJ': 1.3,
-        'holiday': 1.5,
-        'concert': 1.4,
-        'private_event': 0.8
-    }
-    
-    data = []
+    # Clean price once for all venues
+    products_df['price'] = parse_prices(products_df['price'])
+    products_df = products_df.dropna(subset=['price'])
     
     # Generate date range (last 6 months)
     end_date = datetime.now()
@@ -86,97 +198,52 @@ def generate_demand_data(
     sample_size = min(n_samples, len(products_df))
     sampled_products = products_df.sample(n=sample_size, replace=True, random_state=42)
     
-    for idx, product_row in sampled_products.iterrows():
-        venue = product_row['venue']
-        bottle = product_row['bottle']
-        bottle_type = product_row['type']
-        base_price = product_row['price']
-        
-        # Random date/time
-        random_days = random.randint(0, 180)
-        date = start_date + timedelta(days=random_days)
-        day_of_week = date.weekday()  # 0=Monday, 6=Sunday
-        # Generate hour: 18-23 (evening) or 0-2 (late night)
-        if random.random() > 0.5:
-            hour = random.randint(0, 2)  # Late night (0-2 AM)
-        else:
-            hour = random.randint(18, 23)  # Evening (6-11 PM)
-        
-        month = date.month
-        is_weekend = day_of_week >= 4  # Friday, Saturday, Sunday
-        
-        # Random event type (weighted toward regular)
-        event_type = random.choices(
-            list(event_types.keys()),
-            weights=[0.7, 0.15, 0.05, 0.08, 0.02]
-        )[0]
-        event_multiplier = event_types[event_type]
-        is_holiday = (event_type == 'holiday')
-        
-        # Inventory level (0-1, where 1 = fully stocked)
-        inventory_level = random.uniform(0.1, 1.0)
-        
-        # Price variation (some days prices change)
-        price_variation = random.uniform(0.85, 1.15)  # ±15% variation
-        price = base_price * price_variation
-        
-        # Base demand calculation (simulating price elasticity)
-        # Higher price = lower demand (elasticity around -1.5 to -2.0)
-        price_elasticity = -1.8
-        base_demand = 10.0 * (base_price / 400.0) ** price_elasticity  # Normalize to $400
-        
-        # Apply multipliers
-        demand = base_demand
-        
-        # Weekend multiplier
-        if is_weekend:
-            demand *= 2.5 if day_of_week in [4, 5] else 1.8  # Fri/Sat stronger
-        
-        # Peak hours (10 PM - 2 AM)
-        if hour >= 22 or hour <= 2:
-            demand *= 1.5
-        elif hour >= 20:  # 8-10 PM
-            demand *= 1.2
-        
-        # Event multiplier
-        demand *= event_multiplier
-        
-        # Inventory effect (low inventory = slight demand increase due to scarcity)
-        if inventory_level < 0.2:
-            demand *= 1.1
-        
-        # Month effect (summer months higher)
-        if month in [6, 7, 8, 12]:  # June, July, August, December
-            demand *= 1.2
-        
-        # Add noise
-        demand *= random.uniform(0.7, 1.3)
-        
-        # Round to integer (can't sell fractional bottles)
-        bottles_sold = max(0, round(demand))
-        
-        data.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'venue': venue,
-            'bottle': bottle,
-            'type': bottle_type,
-            'price': round(price, 2),
-            'bottles_sold': bottles_sold,
-            'day_of_week': day_of_week,
-            'hour': hour if hour < 24 else hour - 24,
-            'is_weekend': 1 if is_weekend else 0,
-            'is_holiday': 1 if is_holiday else 0,
-            'event_type': event_type,
-            'inventory_level': round(inventory_level, 2),
-            'month': month,
-            'revenue': round(price * bottles_sold, 2)
-        })
-    
-    df = pd.DataFrame(data)
+    # Draw every random input for all rows up front
+    draws = _draw_inputs(sample_size, n_jobs=n_jobs)
+    base_price = sampled_products['price'].to_numpy(dtype=np.float64)
+    
+    # Random date/time
+    dates = pd.Timestamp(start_date) + pd.to_timedelta(draws['random_days'], unit='D')
+    day_of_week = dates.weekday.to_numpy()  # 0=Monday, 6=Sunday
+    month = dates.month.to_numpy()
+    hour = draws['hour']
+    is_weekend = day_of_week >= 4  # Friday, Saturday, Sunday
+    
+    # Random event type
+    event_names = np.array(list(EVENT_TYPES.keys()))
+    event_type = event_names[draws['event_codes']]
+    event_multiplier = np.array(list(EVENT_TYPES.values()))[draws['event_codes']]
+    is_holiday = event_type == 'holiday'
+    
+    inventory_level = draws['inventory_level']
+    price = base_price * draws['price_variation']
+    
+    # Demand from price elasticity and the weekend/peak-hour/event/inventory/month effects
+    noise = draws['noise']
+    bottles_sold = _simulate_demand(
+        base_price, day_of_week, hour, event_multiplier, inventory_level, month, noise
+    )
+    
+    df = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'venue': sampled_products['venue'].to_numpy(),
+        'bottle': sampled_products['bottle'].to_numpy(),
+        'type': sampled_products['type'].to_numpy(),
+        'price': np.round(price, 2),
+        'bottles_sold': bottles_sold,
+        'day_of_week': day_of_week,
+        'hour': hour,
+        'is_weekend': is_weekend.astype(int),
+        'is_holiday': is_holiday.astype(int),
+        'event_type': event_type,
+        'inventory_level': np.round(inventory_level, 2),
+        'month': month,
+        'revenue': np.round(price * bottles_sold, 2)
+    })
     
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    write_demand_history(df, output_path)
     
     print(f"Generated {len(df)} demand records")
     print(f"Date range: {df['date'].min()} to {df['date'].max()}")
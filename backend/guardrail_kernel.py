@@ -0,0 +1,58 @@
+"""
+Price guardrail kernels for the recommendation engines.
+
+Clamp -> round -> re-clamp -> $25 floor (Phase 1) and round -> clamp (hybrid
+engine) run as one fused loop over the catalog instead of several
+full-array NumPy passes.
+
+Nothing runs at import: calling a parallel kernel starts Numba's thread pool,
+which must not exist in a process that later forks (gunicorn workers,
+multiprocessing). cache=True keeps the first call cheap; web_app warms both
+kernels in its workers on startup.
+"""
+
+import numpy as np
+from numba_compat import njit, prange
+
+MIN_RECOMMENDED_PRICE = 25.0  # Never recommend below $25
+
+
+@njit(parallel=True, cache=True)
+def apply_price_guardrails(target_price, min_price, max_price, rounding_base):
+    """
+    Recommended price per row: target clamped to [min_price, max_price], rounded
+    to the nearest rounding_base, clamped again, and floored at $25.
+
+    min_price wins when it exceeds max_price (max(lo, min(hi, x)), not np.clip).
+    No fastmath: rounding must match round() on exact .5 ties.
+
+    Returns:
+        float64 array of recommended prices
+    """
+    n = target_price.shape[0]
+    out = np.empty(n)
+    for i in prange(n):
+        lo = min_price[i]
+        hi = max_price[i]
+        price = max(lo, min(hi, target_price[i]))
+        price = np.rint(price / rounding_base) * rounding_base
+        price = max(lo, min(hi, price))
+        out[i] = max(price, MIN_RECOMMENDED_PRICE)
+    return out
+
+
+@njit(parallel=True, cache=True)
+def round_and_clamp(target_price, min_price, max_price, rounding_base):
+    """
+    Hybrid-engine final price per row: target rounded to the nearest
+    rounding_base, then clamped to [min_price, max_price] (min_price wins).
+
+    Returns:
+        float64 array of recommended prices
+    """
+    n = target_price.shape[0]
+    out = np.empty(n)
+    for i in prange(n):
+        price = np.rint(target_price[i] / rounding_base) * rounding_base
+        out[i] = max(min_price[i], min(max_price[i], price))
+    return out
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for the pricing API (app.py).
+
+Run from the backend directory:
+    gunicorn -c gunicorn.conf.py app:app
+
+`python app.py` still starts the Flask development server for local work.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("PRICING_API_BIND", "0.0.0.0:5000")
+
+# One process per core; threads cover the time handlers spend waiting on SQLite
+workers = int(os.environ.get("PRICING_API_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = 4
+
+# Import the app once in the master so table creation/seeding runs a single time.
+# The model and multiplier LUT are not loaded there: OpenMP / Numba thread pools
+# started before fork() hang the workers on shutdown, so each
+# worker loads its own copy in post_worker_init.
+preload_app = True
+os.environ["PRICING_API_DEFER_MODEL_LOAD"] = "1"
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared across processes
+    from app import app
+    from models import db
+    with app.app_context():
+        db.get_engine(app).dispose()
+
+
+def post_worker_init(worker):
+    # Runs once the worker's signal handlers are installed, so a SIGTERM that
+    # arrives while the model is still loading isn't lost
+    from app import load_model
+    load_model()
@@ -0,0 +1,26 @@
+"""
+Gunicorn settings for the Phase 3 dashboard API (web_app.py).
+
+Run from the backend directory:
+    gunicorn -c gunicorn_web.conf.py web_app:app
+
+`python web_app.py` still starts the Flask development server for local work.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("WEB_APP_BIND", "0.0.0.0:5000")
+
+# One process per core for the CPU-bound pricing work; XGBoost predicts release the
+# GIL, so a few threads per worker keep requests overlapping within a process.
+workers = int(os.environ.get("WEB_APP_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_APP_THREADS", 4))
+
+# No preload_app: each worker imports web_app itself. Startup runs XGBoost and the
+# parallel Numba kernels (warm-up, precomputed responses), and their thread pools
+# don't survive fork(), so workers forked from a warmed-up master hang on shutdown.
+
+# Bulk recommendations over the whole catalog can take a while on a cold worker
+timeout = 120
@@ -1,57 +1,48 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
 import os
 
 def generate_mock_data(n_samples=2000):
-    data = []
+    rng = np.random.default_rng(42)
     
     # Base configuration: Friday (4) and Saturday (5) are peak nights
     peak_days = [4, 5] 
     peak_hours = [22, 23, 0, 1, 2] # 10 PM to 2 AM
     
-    for _ in range(n_samples):
-        # Features
-        hour = random.randint(0, 23)
-        day_of_week = random.randint(0, 6) # 0=Monday, 6=Sunday
-        inventory_level = random.uniform(0, 1) # 0 to 100% capacity
-        bartender_load = random.uniform(0.1, 1.0) # Simulated staff workload
-        
-        # Target Multiplier Calculation (Logic the ML should learn)
-        multiplier = 1.0
-        
-        # Time-based surge
-        if day_of_week in peak_days and hour in peak_hours:
-            multiplier += 0.15
-        elif hour in peak_hours:
-            multiplier += 0.05
-            
-        # Inventory-based surge
-        if inventory_level < 0.2:
-            multiplier += 0.10
-        elif inventory_level < 0.1:
-            multiplier += 0.20
-            
-        # Workload-based surge (to slow down orders)
-        if bartender_load > 0.8:
-            multiplier += 0.05
-            
-        # Add some noise
-        multiplier += random.uniform(-0.02, 0.02)
-        
-        # Guardrails (PRD: Max surge +20% / Max discount -15%, but we'll let ML learn the range)
-        multiplier = max(0.85, min(1.20, multiplier))
-        
-        data.append({
-            'hour': hour,
-            'day_of_week': day_of_week,
-            'inventory_level': inventory_level,
-            'bartender_load': bartender_load,
-            'target_multiplier': multiplier
-        })
-        
-    df = pd.DataFrame(data)
+    # Features (all samples drawn at once)
+    hour = rng.integers(0, 24, size=n_samples)
+    day_of_week = rng.integers(0, 7, size=n_samples) # 0=Monday, 6=Sunday
+    inventory_level = rng.uniform(0, 1, size=n_samples) # 0 to 100% capacity
+    bartender_load = rng.uniform(0.1, 1.0, size=n_samples) # Simulated staff workload
+    
+    # Target Multiplier Calculation (Logic the ML should learn)
+    multiplier = np.ones(n_samples)
+    
+    # Time-based surge
+    is_peak_hour = np.isin(hour, peak_hours)
+    is_peak_day = np.isin(day_of_week, peak_days)
+    multiplier += 0.15 * (is_peak_day & is_peak_hour)
+    multiplier += 0.05 * (~is_peak_day & is_peak_hour)
+    
+    # Inventory-based surge
+    multiplier += 0.10 * (inventory_level < 0.2)
+    
+    # Workload-based surge (to slow down orders)
+    multiplier += 0.05 * (bartender_load > 0.8)
+    
+    # Add some noise
+    multiplier += rng.uniform(-0.02, 0.02, size=n_samples)
+    
+    # Guardrails (PRD: Max surge +20% / Max discount -15%, but we'll let ML learn the range)
+    np.clip(multiplier, 0.85, 1.20, out=multiplier)
+    
+    df = pd.DataFrame({
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'inventory_level': inventory_level,
+        'bartender_load': bartender_load,
+        'target_multiplier': multiplier
+    })
     
     os.makedirs('data', exist_ok=True)
     df.to_csv('data/historical_pricing.csv', index=False)
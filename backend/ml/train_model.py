@@ -1,5 +1,5 @@
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
 import joblib
@@ -17,8 +17,17 @@ def train_model():
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
     # Train
-    # Using RandomForest for non-linear relationships (Peak hours + Day)
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    # Histogram gradient boosting for non-linear relationships (Peak hours + Day);
+    # day_of_week is split natively as a categorical instead of as an ordinal
+    model = HistGradientBoostingRegressor(
+        max_iter=200,
+        learning_rate=0.05,
+        max_depth=6,
+        early_stopping=True,
+        validation_fraction=0.1,
+        categorical_features=['day_of_week'],
+        random_state=42
+    )
     model.fit(X_train, y_train)
     
     # Evaluate
@@ -28,7 +37,7 @@ def train_model():
     
     # Save
     os.makedirs('models', exist_ok=True)
-    joblib.dump(model, 'models/pricing_model.joblib')
+    joblib.dump(model, 'models/pricing_model.joblib', compress=3)
     print("Model saved to models/pricing_model.joblib")
 
 if __name__ == "__main__":
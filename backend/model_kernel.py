@@ -0,0 +1,101 @@
+"""
+Compiled forward pass for the XGBoost demand model.
+
+The booster's trees are flattened into parallel node arrays, so prediction
+runs as a Numba kernel instead of going through XGBoost's per-call setup.
+"""
+
+import json
+
+import numpy as np
+from numba_compat import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def _predict_boosted(X, roots, left, right, feature, threshold, default_left, value, base_score):
+    out = np.empty(X.shape[0], dtype=np.float32)
+    n_trees = roots.shape[0]
+    for i in prange(X.shape[0]):
+        # float32 throughout and trees summed in order, as XGBoost's CPU predictor does
+        total = base_score
+        for t in range(n_trees):
+            node = roots[t]
+            while left[node] != -1:
+                x = X[i, feature[node]]
+                if np.isnan(x):
+                    node = left[node] if default_left[node] else right[node]
+                elif x < threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            total += value[node]
+        out[i] = total
+    return out
+
+
+class CompiledBooster:
+    """XGBoost gbtree regressor flattened into node arrays."""
+
+    # Objectives whose prediction is the raw margin (no link function)
+    IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror')
+
+    def __init__(self, trees, base_score):
+        offsets = np.cumsum([0] + [len(t['left_children']) for t in trees])
+        self.roots = offsets[:-1].astype(np.int64)
+        left, right = [], []
+        for tree, offset in zip(trees, self.roots):
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            is_leaf = tree_left == -1
+            left.append(np.where(is_leaf, -1, tree_left + offset))
+            right.append(np.where(is_leaf, -1, np.asarray(tree['right_children'], dtype=np.int64) + offset))
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.feature = np.concatenate([t['split_indices'] for t in trees]).astype(np.int64)
+        # Split nodes hold their threshold here, leaves their (learning-rate scaled) value
+        self.threshold = np.concatenate([t['split_conditions'] for t in trees]).astype(np.float32)
+        self.default_left = np.concatenate([t['default_left'] for t in trees]).astype(np.bool_)
+        self.base_score = np.float32(base_score)
+
+    def predict(self, rows):
+        X = np.asarray(rows, dtype=np.float32)
+        return _predict_boosted(X, self.roots, self.left, self.right, self.feature,
+                                self.threshold, self.default_left, self.threshold, self.base_score)
+
+
+def compile_booster(booster, iteration_range=(0, 0)):
+    """
+    Build a compiled predictor for a single-output XGBoost regression booster.
+
+    iteration_range is the (begin, end) range passed to XGBoost's predict;
+    (0, 0) means every boosting round.
+
+    Returns:
+        CompiledBooster, or None if the booster isn't supported
+        (dart/linear boosters, categorical splits, multi-output, link functions)
+    """
+    try:
+        model = json.loads(booster.save_raw('json'))['learner']
+        config = json.loads(booster.save_config())['learner']
+        if model['gradient_booster']['name'] != 'gbtree':
+            return None
+        if config['objective']['name'] not in CompiledBooster.IDENTITY_OBJECTIVES:
+            return None
+        params = model['learner_model_param']
+        if int(params.get('num_target', 1)) != 1 or int(params.get('num_class', 0)) > 1:
+            return None
+        trees = model['gradient_booster']['model']['trees']
+        per_round = int(model['gradient_booster']['model']['gbtree_model_param'].get('num_parallel_tree', 1))
+        begin, end = iteration_range
+        if end > 0:
+            trees = trees[begin * per_round:end * per_round]
+        if any(any(t['split_type']) for t in trees):
+            return None
+        # base_score is written as "[3.02E1]" (vector form) by newer XGBoost
+        base_score = float(params['base_score'].strip('[]'))
+        compiled = CompiledBooster(trees, base_score)
+        compiled.predict(np.zeros((0, int(params['num_feature']))))  # JIT now, not on the first request
+        return compiled
+    except Exception as e:
+        print(f"Could not compile booster, using XGBoost directly: {e}")
+        return None
+
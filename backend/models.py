@@ -4,8 +4,10 @@ from datetime import datetime
 db = SQLAlchemy()
 
 class Product(db.Model):
+    __table_args__ = (db.Index('ix_product_inventory', 'inventory_count'),)
+
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     base_price = db.Column(db.Float, nullable=False)
     current_price = db.Column(db.Float, nullable=False)
     inventory_count = db.Column(db.Integer, default=0)
@@ -19,10 +21,18 @@ class Product(db.Model):
             "inventory_count": self.inventory_count
         }
 
+    @classmethod
+    def columns_tuple(cls):
+        """Columns serialized by to_dict(), for selecting plain rows instead of objects."""
+        return (cls.id, cls.name, cls.base_price, cls.current_price, cls.inventory_count)
+
 class PricingRule(db.Model):
+    # Active-rule lookups filter on is_active and read rule_type
+    __table_args__ = (db.Index('ix_rule_active_type', 'is_active', 'rule_type'),)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    rule_type = db.Column(db.String(50), nullable=False) # e.g., 'inventory_low', 'time_of_day'
+    rule_type = db.Column(db.String(50), nullable=False, index=True) # e.g., 'inventory_low', 'time_of_day'
     adjustment_factor = db.Column(db.Float, nullable=False) # e.g., 1.10 for +10%
     is_active = db.Column(db.Boolean, default=True)
 
@@ -34,3 +44,20 @@ class PricingRule(db.Model):
             "adjustment_factor": self.adjustment_factor,
             "is_active": self.is_active
         }
+
+    @classmethod
+    def columns_tuple(cls):
+        """Columns serialized by to_dict(), for selecting plain rows instead of objects."""
+        return (cls.id, cls.name, cls.rule_type, cls.adjustment_factor, cls.is_active)
+
+
+def bulk_as_dicts(query):
+    """
+    Results of a Product/PricingRule query as to_dict()-style dicts.
+    
+    Selects only the model's columns_tuple() as plain rows, so no ORM objects
+    are hydrated; the dicts are ready for orjson/json serialization.
+    """
+    columns = query.column_descriptions[0]['entity'].columns_tuple()
+    keys = [c.key for c in columns]
+    return [dict(zip(keys, row)) for row in query.with_entities(*columns).all()]
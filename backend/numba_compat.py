@@ -0,0 +1,26 @@
+"""
+Optional Numba support for the compiled kernels.
+
+Exposes njit/prange from numba when it is installed. Otherwise njit is a
+no-op decorator and prange is range, so kernels still run as plain Python.
+"""
+
+import os
+
+try:
+    from numba import config, njit, prange
+    NUMBA_AVAILABLE = True
+    # Prefer OpenMP for the parallel kernels: TBB's pool hangs interpreter exit
+    # when it is first started from a non-main thread (Streamlit script thread,
+    # Flask request threads). Set NUMBA_THREADING_LAYER(_PRIORITY) to override.
+    if 'NUMBA_THREADING_LAYER_PRIORITY' not in os.environ:
+        config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
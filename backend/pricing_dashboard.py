@@ -5,6 +5,7 @@ Visualizes pricing recommendations, VPI, BPS, and market benchmarks.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
@@ -23,17 +24,66 @@ st.set_page_config(
 st.title("💰 Dynamic Pricing Recommendation Engine")
 st.markdown("---")
 
-# Initialize session state
-if 'engine' not in st.session_state:
-    csv_dir = os.path.join(os.path.dirname(__file__), "..")
+
+@st.cache_resource
+def load_engine(csv_dir: str) -> PricingEngine:
+    """Load data and benchmarks once per server process, shared by all sessions."""
     engine = PricingEngine(csv_dir=csv_dir)
     engine.load_data()
     engine.compute_benchmarks()
     engine.compute_vpi()
-    st.session_state.engine = engine
-    st.session_state.recommendations = None
+    return engine
+
+
+@st.cache_data(show_spinner=False)
+def get_recommendations(_engine: PricingEngine, max_change_pct: float, rounding_base: int) -> pd.DataFrame:
+    """Recommendations per settings; cached so reruns don't regenerate them (_engine isn't hashed)."""
+    return _engine.generate_all_recommendations(
+        max_change_pct=max_change_pct,
+        rounding_base=rounding_base
+    )
 
-engine = st.session_state.engine
+
+@st.cache_data(show_spinner=False)
+def price_box_stats(_engine: PricingEngine) -> pd.DataFrame:
+    """
+    Box-plot summary of price per (venue, type): quartiles plus 1.5 IQR whisker fences.
+    
+    Only these five numbers per box are sent to the browser instead of every price.
+    """
+    df = _engine.df
+    stats = df.groupby(['venue', 'type'], observed=True)['price'].quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    
+    # Whiskers end at the most extreme prices within 1.5 IQR of the box
+    bounds = pd.DataFrame({'low': stats['q1'] - 1.5 * iqr, 'high': stats['q3'] + 1.5 * iqr})
+    prices = df[['venue', 'type', 'price']].join(bounds, on=['venue', 'type'])
+    groups = ['venue', 'type']
+    stats['lowerfence'] = prices[prices['price'] >= prices['low']].groupby(groups, observed=True)['price'].min()
+    stats['upperfence'] = prices[prices['price'] <= prices['high']].groupby(groups, observed=True)['price'].max()
+    return stats.reset_index()
+
+
+def smallest_k(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k smallest values in ascending order, ties kept in row order
+    (same rows as nsmallest(k, keep='first')), using an O(n) partition instead of a sort.
+    """
+    if len(values) <= k:
+        return np.argsort(values, kind='stable')
+    kth = np.partition(values, k - 1)[k - 1]
+    below = np.flatnonzero(values < kth)
+    ties = np.flatnonzero(values == kth)[:k - len(below)]
+    idx = np.concatenate([below, ties])
+    return idx[np.argsort(values[idx], kind='stable')]
+
+
+engine = load_engine(os.path.join(os.path.dirname(__file__), ".."))
+
+# Initialize session state
+if 'recommendation_settings' not in st.session_state:
+    st.session_state.recommendation_settings = None
 
 # Sidebar
 st.sidebar.header("⚙️ Settings")
@@ -56,23 +106,14 @@ rounding_base = st.sidebar.selectbox(
 
 if st.sidebar.button("🔄 Generate Recommendations", type="primary"):
     with st.spinner("Generating recommendations..."):
-        df_recs = engine.generate_all_recommendations(
-            max_change_pct=max_change_pct,
-            rounding_base=rounding_base
-        )
-        st.session_state.recommendations = df_recs
+        st.session_state.recommendation_settings = (max_change_pct, rounding_base)
+        get_recommendations(engine, max_change_pct, rounding_base)
         st.success("Recommendations generated!")
 
-# Load recommendations if available
-if st.session_state.recommendations is not None:
-    df_recs = st.session_state.recommendations
-else:
-    # Generate default recommendations
-    df_recs = engine.generate_all_recommendations(
-        max_change_pct=max_change_pct,
-        rounding_base=rounding_base
-    )
-    st.session_state.recommendations = df_recs
+# Recommendations for the last generated settings (defaults to the current ones)
+if st.session_state.recommendation_settings is None:
+    st.session_state.recommendation_settings = (max_change_pct, rounding_base)
+df_recs = get_recommendations(engine, *st.session_state.recommendation_settings)
 
 # Tabs
 tab1, tab2, tab3, tab4 = st.tabs([
@@ -88,10 +129,12 @@ with tab1:
     # Summary metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    total_recs = len(df_recs)
-    increases = len(df_recs[df_recs['delta_pct'] > 1])
-    decreases = len(df_recs[df_recs['delta_pct'] < -1])
-    unchanged = len(df_recs[abs(df_recs['delta_pct']) < 1])
+    # Count straight off the delta array (no filtered DataFrame copies)
+    deltas = df_recs['delta_pct'].to_numpy()
+    total_recs = len(deltas)
+    increases = int(np.count_nonzero(deltas > 1))
+    decreases = int(np.count_nonzero(deltas < -1))
+    unchanged = int(np.count_nonzero(np.abs(deltas) < 1))
     
     col1.metric("Total Recommendations", total_recs)
     col2.metric("Price Increases", increases, delta=f"+{increases}")
@@ -99,8 +142,7 @@ with tab1:
     col4.metric("No Change", unchanged)
     
     # Revenue impact estimate
-    current_revenue = df_recs['current_price'].sum()
-    recommended_revenue = df_recs['recommended_price'].sum()
+    current_revenue, recommended_revenue = df_recs[['current_price', 'recommended_price']].to_numpy(dtype=float).sum(axis=0)
     revenue_delta = recommended_revenue - current_revenue
     revenue_delta_pct = (revenue_delta / current_revenue) * 100
     
@@ -115,7 +157,7 @@ with tab1:
         )
     
     with col2:
-        avg_delta = df_recs['delta_pct'].mean()
+        avg_delta = deltas.mean()
         st.metric(
             "Average Price Change",
             f"{avg_delta:+.1f}%",
@@ -124,13 +166,15 @@ with tab1:
     
     # Distribution chart
     st.subheader("Price Change Distribution")
-    fig = px.histogram(
-        df_recs,
-        x='delta_pct',
-        nbins=30,
-        labels={'delta_pct': 'Price Change %', 'count': 'Number of Products'},
-        color_discrete_sequence=['#1f77b4']
-    )
+    # Bin server-side: the figure carries 30 bar heights instead of every delta
+    counts, edges = np.histogram(df_recs['delta_pct'].to_numpy(), bins=30)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#1f77b4'
+    ))
+    fig.update_layout(xaxis_title='Price Change %', yaxis_title='Number of Products', bargap=0)
     fig.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="No Change")
     st.plotly_chart(fig, use_container_width=True)
     
@@ -141,19 +185,21 @@ with tab1:
     
     with col1:
         st.markdown("**Largest Increases**")
-        top_increases = df_recs.nlargest(10, 'delta_pct')[
+        top_increases = df_recs.iloc[smallest_k(-deltas, 10)][
             ['venue', 'bottle', 'type', 'current_price', 'recommended_price', 'delta_pct', 'reason']
         ]
         st.dataframe(top_increases, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("**Largest Decreases**")
-        top_decreases = df_recs.nsmallest(10, 'delta_pct')[
+        top_decreases = df_recs.iloc[smallest_k(deltas, 10)][
             ['venue', 'bottle', 'type', 'current_price', 'recommended_price', 'delta_pct', 'reason']
         ]
         st.dataframe(top_decreases, use_container_width=True, hide_index=True)
 
-with tab2:
+@st.fragment
+def venue_tab(df_recs: pd.DataFrame):
+    """By Venue tab. Picking a venue reruns only this fragment, not the whole app."""
     st.header("🏢 Recommendations by Venue")
     
     venue = st.selectbox("Select Venue", df_recs['venue'].unique())
@@ -169,20 +215,21 @@ with tab2:
     # Price comparison chart
     st.subheader("Current vs Recommended Prices")
     
-    # Sample for visualization (limit to 30 items for readability)
+    # Sample for visualization (first 30 items for readability - only those rows get sorted)
     viz_df = venue_recs.head(30).sort_values('current_price', ascending=False)
+    bottles = viz_df['bottle'].to_numpy()
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
         name='Current Price',
-        x=viz_df['bottle'],
-        y=viz_df['current_price'],
+        x=bottles,
+        y=viz_df['current_price'].to_numpy(),
         marker_color='lightblue'
     ))
     fig.add_trace(go.Bar(
         name='Recommended Price',
-        x=viz_df['bottle'],
-        y=viz_df['recommended_price'],
+        x=bottles,
+        y=viz_df['recommended_price'].to_numpy(),
         marker_color='lightgreen'
     ))
     fig.update_layout(
@@ -202,7 +249,12 @@ with tab2:
         hide_index=True
     )
 
-with tab3:
+with tab2:
+    venue_tab(df_recs)
+
+@st.fragment
+def product_type_tab(df_recs: pd.DataFrame):
+    """By Product tab. Picking a type reruns only this fragment, not the whole app."""
     st.header("🍾 Recommendations by Product Type")
     
     product_type = st.selectbox("Select Product Type", sorted(df_recs['type'].unique()))
@@ -217,11 +269,11 @@ with tab3:
     # Price by venue comparison
     st.subheader(f"{product_type} Pricing Across Venues")
     
-    pivot_df = type_recs.pivot_table(
+    # Plain reshape - keep the first row of any repeated bottle/venue pair, as aggfunc='first' did
+    pivot_df = type_recs.drop_duplicates(['bottle', 'venue']).pivot(
         index='bottle',
         columns='venue',
-        values=['current_price', 'recommended_price'],
-        aggfunc='first'
+        values=['current_price', 'recommended_price']
     ).reset_index()
     
     st.dataframe(pivot_df, use_container_width=True)
@@ -247,15 +299,17 @@ with tab3:
     ))
     st.plotly_chart(fig, use_container_width=True)
 
+with tab3:
+    product_type_tab(df_recs)
+
 with tab4:
     st.header("📈 Market Analysis")
     
     # VPI comparison
     st.subheader("Venue Premium Index (VPI)")
-    vpi_df = pd.DataFrame([
-        {'Venue': venue, 'VPI': vpi, 'Premium %': (vpi - 1) * 100}
-        for venue, vpi in engine.venue_vpi.items()
-    ]).sort_values('VPI', ascending=False)
+    vpi_df = engine.venue_vpi.rename_axis('Venue').reset_index(name='VPI')
+    vpi_df['Premium %'] = (vpi_df['VPI'] - 1) * 100
+    vpi_df = vpi_df.sort_values('VPI', ascending=False)
     
     fig = px.bar(
         vpi_df,
@@ -276,13 +330,23 @@ with tab4:
     st.subheader("Price Distribution by Alcohol Type")
     
     if engine.df is not None:
-        fig = px.box(
-            engine.df,
-            x='type',
-            y='price',
-            color='venue',
-            labels={'type': 'Alcohol Type', 'price': 'Price ($)'},
-            title="Price Distribution Across Venues by Type"
+        # Boxes drawn from precomputed quartiles/fences (outlier points aren't shown)
+        fig = go.Figure()
+        for venue_name, venue_stats in price_box_stats(engine).groupby('venue', observed=True):
+            fig.add_trace(go.Box(
+                name=venue_name,
+                x=venue_stats['type'],
+                q1=venue_stats['q1'],
+                median=venue_stats['median'],
+                q3=venue_stats['q3'],
+                lowerfence=venue_stats['lowerfence'],
+                upperfence=venue_stats['upperfence']
+            ))
+        fig.update_layout(
+            boxmode='group',
+            title="Price Distribution Across Venues by Type",
+            xaxis_title='Alcohol Type',
+            yaxis_title='Price ($)'
         )
         fig.update_xaxes(tickangle=-45)
         st.plotly_chart(fig, use_container_width=True)
@@ -294,27 +358,21 @@ with tab4:
     
     with col1:
         st.markdown("**Median Prices by Type**")
-        type_medians_df = pd.DataFrame([
-            {'Type': k, 'Median Price': v}
-            for k, v in sorted(engine.type_medians.items(), key=lambda x: x[1], reverse=True)
-        ])
+        type_medians_df = (
+            engine.type_medians.sort_values(ascending=False, kind='stable')
+            .rename_axis('Type').reset_index(name='Median Price')
+        )
         st.dataframe(type_medians_df, use_container_width=True, hide_index=True)
     
     with col2:
         st.markdown("**Top Premium Brands (by BPS)**")
-        top_bps = sorted(
-            [(k, v) for k, v in engine.brand_bps.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:20]
-        bps_df = pd.DataFrame([
-            {
-                'Brand': k,
-                'BPS': f"{v:.2f}x",
-                'Market Median': f"${engine.brand_medians.get(k, 0):.0f}"
-            }
-            for k, v in top_bps
-        ])
+        # Built column-wise (stable sort keeps tied brands in benchmark order)
+        top_bps = pd.Series(engine.brand_bps, dtype=float).sort_values(ascending=False, kind='stable').head(20)
+        bps_df = pd.DataFrame({
+            'Brand': top_bps.index,
+            'BPS': top_bps.map('{:.2f}x'.format).to_numpy(),
+            'Market Median': engine.brand_medians.reindex(top_bps.index, fill_value=0).map('${:.0f}'.format).to_numpy()
+        })
         st.dataframe(bps_df, use_container_width=True, hide_index=True)
 
 # Download button
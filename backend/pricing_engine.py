@@ -5,10 +5,24 @@ MVP implementation using market benchmarking, VPI, and BPS.
 
 import pandas as pd
 import numpy as np
+import os
 from pathlib import Path
 import re
+import tempfile
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from guardrail_kernel import apply_price_guardrails
+from venue_csv import CSV_COLUMNS, parse_prices
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 try:
     from cost_manager import CostManager
@@ -17,6 +31,183 @@ except ImportError:
     COST_MANAGER_AVAILABLE = False
 
 
+def _lookup(column: pd.Series, values: pd.Series) -> np.ndarray:
+    """
+    values[key] for every row of column as float64, NaN where the key is missing.
+    
+    For a categorical column the lookup table is built once per category and
+    indexed by the integer codes, instead of hashing every row's string.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.map(values).to_numpy(dtype=np.float64, na_value=np.nan)
+    table = values.reindex(column.cat.categories).to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.append(table, np.nan)[column.cat.codes.to_numpy()]  # code -1 (missing) -> NaN
+
+
+# Catalog prices are stored as float32 (cent precision). Values leaving that
+# storage are cast back to float64 and re-rounded so $12.99 stays 12.99 rather
+# than 12.989999771118164; a median of cent prices can fall on a half cent.
+PRICE_DECIMALS = 2
+MEDIAN_DECIMALS = 3
+
+
+def float64_prices(values, decimals: int = PRICE_DECIMALS) -> np.ndarray:
+    """float32 catalog prices as float64, rounded back to whole cents."""
+    return np.round(np.asarray(values, dtype=np.float64), decimals)
+
+
+# Standardized columns of a loaded venue file (see _load_one_csv)
+CATALOG_COLUMNS = ['venue', 'bottle', 'type', 'price']
+
+
+def _format_unique(values: np.ndarray, fmt: str) -> np.ndarray:
+    """Format each distinct value once and broadcast the strings back to every row."""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return np.array([fmt.format(u) for u in uniques.tolist()], dtype=object)[inverse]
+
+
+def _read_csv(csv_file: Path) -> pd.DataFrame:
+    """
+    Read a venue CSV, with the name/type/price columns typed as strings.
+    
+    Uses pyarrow's multithreaded reader (Arrow-backed columns, no copy
+    into object arrays) when available, else pandas' C parser.
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(csv_file)
+    
+    table = pacsv.read_csv(
+        csv_file,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in CSV_COLUMNS},
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _venue_name(csv_file: Path) -> str:
+    """Venue name from a "Drink Pricing - <venue>.csv" filename."""
+    return csv_file.stem.replace("Drink Pricing - ", "")
+
+
+def _load_one_csv(csv_file: Path) -> Optional[pd.DataFrame]:
+    """
+    Read one venue CSV into venue/bottle/type/price columns.
+    
+    The standardized columns are cached in a Snappy Parquet sidecar next to
+    the CSV (when pyarrow is installed) and read from there until the CSV
+    changes. Returns None (after logging) if the file can't be loaded.
+    """
+    venue_name = _venue_name(csv_file)
+    sidecar = csv_file.with_suffix('.parquet')
+    
+    if PYARROW_AVAILABLE:
+        try:
+            if sidecar.stat().st_mtime_ns >= csv_file.stat().st_mtime_ns:
+                return pd.read_parquet(sidecar, columns=CATALOG_COLUMNS)
+        except FileNotFoundError:
+            pass  # No sidecar yet
+        except Exception as e:
+            # Unreadable sidecar (e.g. left by an older version): re-parse the CSV
+            print(f"Ignoring cached {sidecar.name}: {e}")
+    
+    try:
+        df = _read_csv(csv_file)
+        
+        # Standardize column names
+        df.columns = df.columns.str.strip()
+        
+        # Map to standard columns
+        col_mapping = {
+            'Name': 'bottle',
+            'Type of Liquor': 'type',
+            'Price': 'price'
+        }
+        
+        # Find best matching columns
+        for old_col, new_col in col_mapping.items():
+            for col in df.columns:
+                if old_col.lower() in col.lower() or new_col.lower() in col.lower():
+                    df = df.rename(columns={col: new_col})
+                    break
+        
+        # Add venue column
+        df['venue'] = venue_name
+        
+        # Clean bottle and type names
+        if 'bottle' in df.columns:
+            df['bottle'] = df['bottle'].astype(str).str.strip()
+        if 'type' in df.columns:
+            df['type'] = df['type'].astype(str).str.strip()
+        
+        df = df[CATALOG_COLUMNS]
+        if PYARROW_AVAILABLE:
+            _write_sidecar(df, sidecar)
+        return df
+        
+    except Exception as e:
+        print(f"Error loading {csv_file}: {e}")
+        return None
+
+
+def _write_sidecar(df: pd.DataFrame, sidecar: Path):
+    """
+    Write the Parquet cache for one venue atomically.
+    
+    Other processes (web app, dashboard, API) load the same data directory, so
+    the file is written under a temporary name and renamed into place; readers
+    never see a partly written sidecar.
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=sidecar.parent, prefix=sidecar.name, suffix='.tmp')
+    except OSError:
+        return  # read-only data directory: just parse the CSV next time
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            df.to_parquet(f, compression='snappy', index=False)
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+@lru_cache(maxsize=4)
+def _load_catalog(files_key: Tuple[Tuple[str, int], ...]) -> pd.DataFrame:
+    """
+    Cleaned venue/bottle/type/price catalog for (path, mtime_ns) pairs of venue CSVs.
+    
+    Memoized: callers must copy the result before modifying it.
+    """
+    csv_files = [Path(path) for path, _ in files_key]
+    
+    # Parse venue files concurrently (pandas releases the GIL while parsing)
+    with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as pool:
+        all_data = [df for df in pool.map(_load_one_csv, csv_files) if df is not None]
+    
+    if not all_data:
+        raise ValueError("No valid data loaded from CSV files")
+    
+    df = pd.concat(all_data, ignore_index=True)
+    
+    # Clean price column once for all venues - strip $/commas in one regex pass, convert to float
+    df['price'] = parse_prices(df['price'].astype(str))
+    df = df.dropna(subset=['price']).reset_index(drop=True)  # Remove rows with invalid prices
+    df['price'] = df['price'].astype('float32')  # prices only need cent precision
+    
+    # Normalize bottle names (handle variations)
+    df['bottle_normalized'] = df['bottle'].str.lower().str.strip()
+    
+    # Few distinct venues/types/brands: categorical codes make groupby and filters cheap
+    for col in ('venue', 'type', 'bottle', 'bottle_normalized'):
+        df[col] = df[col].astype('category')
+    
+    return df
+
+
 class PricingEngine:
     """
     Dynamic Pricing Engine that generates price recommendations based on:
@@ -35,77 +226,39 @@ class PricingEngine:
         """
         self.csv_dir = Path(csv_dir)
         self.df = None
-        self.venue_vpi = {}  # Venue Premium Index per venue
+        self.venue_vpi = pd.Series(dtype=float)  # Venue Premium Index per venue
         self.global_avg_price = None
-        self.brand_medians = {}  # Median price per brand across all venues
-        self.type_medians = {}  # Median price per alcohol type
+        self.brand_medians = pd.Series(dtype=float)  # Median price per brand across all venues
+        self.type_medians = pd.Series(dtype=float)  # Median price per alcohol type
         self.brand_bps = {}  # Brand Premium Score per brand within type
         self.cost_manager = cost_manager  # Cost manager for profit constraints
+        # Memoized (normalized bottle, type) -> market price; cleared when benchmarks change
+        self._market_price_cached = lru_cache(maxsize=None)(self._market_price_estimate)
         
-    def load_data(self) -> pd.DataFrame:
+    def load_data(self, filter_venue: Optional[str] = None) -> pd.DataFrame:
         """
         Load and consolidate all venue CSV files.
         Extracts venue name from filename.
+        
+        The cleaned catalog is memoized per set of files (path + mtime), so
+        further engines over the same directory skip parsing entirely.
+        
+        Args:
+            filter_venue: If provided, only this venue's file is read
         """
         csv_files = list(self.csv_dir.glob("Drink Pricing*.csv"))
         
         if not csv_files:
             raise ValueError(f"No CSV files found in {self.csv_dir}")
         
-        all_data = []
-        
-        for csv_file in csv_files:
-            # Extract venue name from filename
-            venue_name = csv_file.stem.replace("Drink Pricing - ", "")
-            
-            try:
-                df = pd.read_csv(csv_file)
-                
-                # Standardize column names
-                df.columns = df.columns.str.strip()
-                
-                # Map to standard columns
-                col_mapping = {
-                    'Name': 'bottle',
-                    'Type of Liquor': 'type',
-                    'Price': 'price'
-                }
-                
-                # Find best matching columns
-                for old_col, new_col in col_mapping.items():
-                    for col in df.columns:
-                        if old_col.lower() in col.lower() or new_col.lower() in col.lower():
-                            df = df.rename(columns={col: new_col})
-                            break
-                
-                # Add venue column
-                df['venue'] = venue_name
-                
-                # Clean price column - remove $ and commas, convert to float
-                if 'price' in df.columns:
-                    df['price'] = df['price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-                    df['price'] = pd.to_numeric(df['price'], errors='coerce')
-                    df = df.dropna(subset=['price'])  # Remove rows with invalid prices
-                    
-                # Clean bottle and type names
-                if 'bottle' in df.columns:
-                    df['bottle'] = df['bottle'].astype(str).str.strip()
-                if 'type' in df.columns:
-                    df['type'] = df['type'].astype(str).str.strip()
-                    
-                all_data.append(df[['venue', 'bottle', 'type', 'price']])
-                
-            except Exception as e:
-                print(f"Error loading {csv_file}: {e}")
-                continue
-        
-        if not all_data:
-            raise ValueError("No valid data loaded from CSV files")
+        if filter_venue is not None:
+            # One file per venue, so the venue filter is applied before any parsing
+            csv_files = [f for f in csv_files if _venue_name(f) == filter_venue]
+            if not csv_files:
+                raise ValueError(f"Venue '{filter_venue}' not found in data")
         
-        self.df = pd.concat(all_data, ignore_index=True)
-        
-        # Normalize bottle names (handle variations)
-        self.df['bottle_normalized'] = self.df['bottle'].str.lower().str.strip()
+        files_key = tuple((str(f.resolve()), f.stat().st_mtime_ns) for f in csv_files)
+        self.df = _load_catalog(files_key).copy()  # each engine gets its own frame to modify
         
         print(f"Loaded {len(self.df)} records from {len(csv_files)} venues")
         return self.df
@@ -116,28 +269,23 @@ class PricingEngine:
             raise ValueError("Data not loaded. Call load_data() first.")
         
         # Global average price
-        self.global_avg_price = self.df['price'].median()
+        self.global_avg_price = round(float(self.df['price'].median()), MEDIAN_DECIMALS)
         
         # Brand medians (across all venues)
-        self.brand_medians = self.df.groupby('bottle_normalized')['price'].median().to_dict()
+        # Kept as Series so lookups over the catalog are a single .map() join;
+        # float64 (see MEDIAN_DECIMALS) so VPI/BPS ratios aren't taken in float32
+        brand_groups = self.df.groupby('bottle_normalized', observed=True)
+        self.brand_medians = brand_groups['price'].median().astype('float64').round(MEDIAN_DECIMALS)
         
         # Type medians (across all venues)
-        self.type_medians = self.df.groupby('type')['price'].median().to_dict()
-        
-        # Brand Premium Score (BPS): brand median / type median
-        self.brand_bps = {}
-        for bottle, brand_median in self.brand_medians.items():
-            # Find the type(s) for this brand
-            brand_types = self.df[self.df['bottle_normalized'] == bottle]['type'].unique()
-            if len(brand_types) > 0:
-                # Use the most common type for this brand
-                type_median = self.type_medians.get(brand_types[0], brand_median)
-                if type_median > 0:
-                    self.brand_bps[bottle] = brand_median / type_median
-                else:
-                    self.brand_bps[bottle] = 1.0
-            else:
-                self.brand_bps[bottle] = 1.0
+        self.type_medians = self.df.groupby('type', observed=True)['price'].median().astype('float64').round(MEDIAN_DECIMALS)
+        
+        # Brand Premium Score (BPS): brand median / median of the brand's type
+        # (the first type listed for the brand), joined in one pass over all brands
+        type_medians = brand_groups['type'].first().map(self.type_medians).fillna(self.brand_medians)
+        self.brand_bps = (self.brand_medians / type_medians).where(type_medians > 0, 1.0).to_dict()
+        
+        self._market_price_cached.cache_clear()
         
         print(f"Computed benchmarks:")
         print(f"  Global median price: ${self.global_avg_price:.2f}")
@@ -155,10 +303,12 @@ class PricingEngine:
         if self.global_avg_price is None:
             self.compute_benchmarks()
         
-        venue_medians = self.df.groupby('venue')['price'].median()
+        venue_medians = self.df.groupby('venue', observed=True)['price'].median().astype('float64').round(MEDIAN_DECIMALS)
         
-        for venue, venue_median in venue_medians.items():
-            self.venue_vpi[venue] = venue_median / self.global_avg_price if self.global_avg_price > 0 else 1.0
+        if self.global_avg_price > 0:
+            self.venue_vpi = venue_medians / self.global_avg_price
+        else:
+            self.venue_vpi = pd.Series(1.0, index=venue_medians.index)
         
         print(f"\nVenue Premium Index (VPI):")
         for venue, vpi in sorted(self.venue_vpi.items(), key=lambda x: x[1], reverse=True):
@@ -170,8 +320,10 @@ class PricingEngine:
         1. Brand median (if exists across venues)
         2. Type median (fallback)
         """
-        bottle_norm = bottle.lower().strip()
-        
+        return self._market_price_cached(bottle.lower().strip(), bottle_type)
+    
+    def _market_price_estimate(self, bottle_norm: str, bottle_type: str) -> float:
+        """Uncached get_market_price_estimate for an already-normalized bottle name."""
         # Try brand median first
         if bottle_norm in self.brand_medians:
             return self.brand_medians[bottle_norm]
@@ -350,37 +502,159 @@ class PricingEngine:
         
         return explanation
     
+    def _generate_reasons(
+        self,
+        bottle_type: np.ndarray,
+        current_price: np.ndarray,
+        recommended_price: np.ndarray,
+        market_price: np.ndarray,
+        vpi: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized _generate_reason over whole columns (object array of strings)."""
+        delta_pct = ((recommended_price - current_price) / current_price) * 100
+        
+        # Numeric fields take few distinct values (one per brand/type/venue)
+        type_text = _format_unique(bottle_type.astype(str), '{}')
+        market_text = _format_unique(market_price, '${:.0f}')
+        vpi_text = _format_unique(vpi, '{:.2f}')
+        vpi_premium_text = _format_unique(np.abs(vpi - 1), '{:.0%}')
+        
+        optimal = ("Price is optimal. Current price aligns well with market (" + type_text + " median: "
+                   + market_text + ") and venue positioning (VPI: " + vpi_text + ").")
+        
+        # Compare to market
+        market_median = " market median for " + type_text + " (" + market_text + ")"
+        market_reason = np.where(current_price < market_price * 0.9, "below" + market_median,
+                                 np.where(current_price > market_price * 1.1, "above" + market_median, ""))
+        
+        # Compare to venue positioning
+        venue_reason = np.where(vpi > 1.1, "venue typically prices " + vpi_premium_text + " higher than market",
+                                np.where(vpi < 0.9, "venue typically prices " + vpi_premium_text + " lower than market", ""))
+        
+        has_market = market_reason != ""
+        has_venue = venue_reason != ""
+        reasons = np.where(has_market & has_venue, market_reason + ", " + venue_reason, market_reason + venue_reason)
+        
+        direction = np.where(delta_pct > 0, "increase", "decrease").astype(object)
+        explanation = np.where(has_market | has_venue,
+                               "Recommend " + direction + " due to: " + reasons,
+                               "Minor " + direction + " to align with market positioning")
+        
+        return np.where(np.abs(delta_pct) < 1, optimal, explanation)
+    
     def generate_all_recommendations(
         self,
         max_change_pct: float = 0.15,
-        rounding_base: int = 25
+        rounding_base: int = 25,
+        df: Optional[pd.DataFrame] = None
     ) -> pd.DataFrame:
         """
         Generate recommendations for all bottles across all venues.
         
+        Args:
+            df: Catalog rows to price (e.g. one venue's slice of self.df); defaults to all loaded data
+        
         Returns:
             DataFrame with recommendations
         """
         if self.df is None:
             self.load_data()
         
-        if not self.venue_vpi:
+        if self.venue_vpi.empty:
             self.compute_vpi()
         
-        recommendations = []
+        if df is None:
+            df = self.df
+        n = len(df)
+        current_price = float64_prices(df['price'])
+        
+        # Market price: brand median, else type median, else global median
+        market_price = _lookup(df['bottle_normalized'], self.brand_medians)
+        market_price = np.where(np.isnan(market_price), _lookup(df['type'], self.type_medians), market_price)
+        market_price = np.where(np.isnan(market_price), self.global_avg_price, market_price)
+        vpi = _lookup(df['venue'], self.venue_vpi)
+        vpi = np.where(np.isnan(vpi), 1.0, vpi)
+        
+        # Target price = market_price * VPI, within the max-change guardrails
+        target_price = market_price * vpi
+        max_price = current_price * (1 + max_change_pct)
+        min_price = current_price * (1 - max_change_pct)
+        
+        # Cost-aware constraint: costs come from the (memoized) per-product lookup
+        cost = np.full(n, np.nan)
+        min_profit_price = np.full(n, np.nan)
+        if self.cost_manager:
+            for i, (bottle, bottle_type, price) in enumerate(zip(df['bottle'], df['type'], current_price.tolist())):
+                try:
+                    cost[i] = self.cost_manager.get_cost(bottle, bottle_type, price)
+                    min_profit_price[i] = self.cost_manager.get_minimum_price(cost[i])
+                except Exception as e:
+                    cost[i] = np.nan
+                    print(f"Warning: Could not get cost for {bottle}: {e}")
+        has_cost = ~np.isnan(cost) & ~np.isnan(min_profit_price)
+        min_price = np.where(has_cost, np.fmax(min_price, min_profit_price), min_price)
+        
+        # Clamp, round to nearest rounding_base, re-clamp (rounding can push price
+        # outside guardrails), and keep at least $25 - one fused pass
+        recommended_price = apply_price_guardrails(target_price, min_price, max_price, float(rounding_base))
+        
+        columns = {
+            'venue': df['venue'].to_numpy(),
+            'bottle': df['bottle'].to_numpy(),
+            'type': df['type'].to_numpy(),
+            'current_price': current_price,
+        }
+        
+        reason_suffix = ''
+        if has_cost.any():
+            min_margin = self.cost_manager.min_profit_margin_pct
+            
+            # Final cost check: round unprofitable prices up to a profitable multiple of rounding_base
+            with np.errstate(divide='ignore', invalid='ignore'):
+                margin = np.where(recommended_price > 0, (recommended_price - cost) / recommended_price * 100, 0.0)
+            unprofitable = has_cost & (margin < min_margin * 100)
+            min_profit_rounded = np.round(min_profit_price / rounding_base) * rounding_base
+            min_profit_rounded = np.where(min_profit_rounded < min_profit_price,
+                                          min_profit_rounded + rounding_base, min_profit_rounded)
+            recommended_price = np.where(unprofitable, np.fmax(recommended_price, min_profit_rounded), recommended_price)
+            
+            # Profit metrics
+            with np.errstate(divide='ignore', invalid='ignore'):
+                profit_margin = np.where(recommended_price > 0, (recommended_price - cost) / recommended_price * 100, 0.0)
+                current_profit_margin = np.where(current_price > 0, (current_price - cost) / current_price * 100, 0.0)
+            profit = recommended_price - cost
+            current_profit = current_price - cost
+            note = f" (Note: Price adjusted to maintain {min_margin*100:.0f}% minimum profit margin)"
+            margin_text = " (Profit margin: " + _format_unique(profit_margin, '{:.1f}') + "%)"
+            reason_suffix = np.where(has_cost, np.where(profit_margin < min_margin * 100, note, margin_text), '')
         
-        for _, row in self.df.iterrows():
-            rec = self.recommend_price(
-                venue=row['venue'],
-                bottle=row['bottle'],
-                bottle_type=row['type'],
-                current_price=row['price'],
-                max_change_pct=max_change_pct,
-                rounding_base=rounding_base
-            )
-            recommendations.append(rec)
+        delta_pct = ((recommended_price - current_price) / current_price) * 100
         
-        return pd.DataFrame(recommendations)
+        # Generate explanations
+        columns['recommended_price'] = recommended_price
+        columns['delta_pct'] = np.round(delta_pct, 1)
+        columns['delta_abs'] = np.round(recommended_price - current_price, 2)
+        columns['market_price_estimate'] = np.round(market_price, 2)
+        columns['vpi'] = np.round(vpi, 3)
+        columns['reason'] = self._generate_reasons(
+            columns['type'], current_price, recommended_price, market_price, vpi
+        ) + reason_suffix
+        columns['min_price'] = np.round(min_price, 2)
+        columns['max_price'] = np.round(max_price, 2)
+        
+        # Add profit data if available (NaN for products whose cost lookup failed)
+        if has_cost.any():
+            columns.update({
+                'cost': np.where(has_cost, np.round(cost, 2), np.nan),
+                'profit': np.where(has_cost, np.round(profit, 2), np.nan),
+                'profit_margin_pct': np.where(has_cost, np.round(profit_margin, 1), np.nan),
+                'current_profit': np.where(has_cost, np.round(current_profit, 2), np.nan),
+                'current_profit_margin_pct': np.where(has_cost, np.round(current_profit_margin, 1), np.nan),
+                'profit_change': np.where(has_cost, np.round(profit - current_profit, 2), np.nan),
+                'min_profit_price': np.where(has_cost & (min_profit_price != 0), np.round(min_profit_price, 2), np.nan)
+            })
+        
+        return pd.DataFrame(columns)
     
     def export_recommendations(
         self,
@@ -2,11 +2,15 @@
 Flexible Pricing Engine - Supports both Unified and Separate Instance models
 """
 
-import pandas as pd
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from pricing_engine import PricingEngine
+from pricing_engine import MEDIAN_DECIMALS, PricingEngine
 
 
 class FlexiblePricingEngine(PricingEngine):
@@ -17,7 +21,8 @@ class FlexiblePricingEngine(PricingEngine):
     3. Hybrid model: Single venue with API-fetched benchmarks
     """
     
-    def __init__(self, csv_dir: str = ".", mode: str = "unified", external_benchmarks: Optional[Dict] = None):
+    def __init__(self, csv_dir: str = ".", mode: str = "unified", external_benchmarks: Optional[Dict] = None,
+                 preloaded_df: Optional[pd.DataFrame] = None):
         """
         Initialize the flexible pricing engine.
         
@@ -30,11 +35,15 @@ class FlexiblePricingEngine(PricingEngine):
                     'brand_medians': {brand: price},
                     'type_medians': {type: price}
                 }
+            preloaded_df: Optional already-loaded data (e.g. a unified engine's df)
+                to use instead of reading the CSVs again
         """
         super().__init__(csv_dir)
         self.mode = mode  # "unified" or "separate"
         self.external_benchmarks = external_benchmarks
         self.venue_filter = None  # For separate mode, filter to single venue
+        self.preloaded_df = preloaded_df
+        self._venue_median = None  # Separate mode: median price of the loaded venue
         
     def load_data(self, venue_name: Optional[str] = None) -> pd.DataFrame:
         """
@@ -45,18 +54,31 @@ class FlexiblePricingEngine(PricingEngine):
         """
         if self.mode == "separate" and venue_name:
             self.venue_filter = venue_name
+        self._venue_median = None
         
-        # Load all data first
-        df = super().load_data()
+        separate = self.mode == "separate" and self.venue_filter
         
-        # Filter to single venue if in separate mode
-        if self.mode == "separate" and self.venue_filter:
-            df = df[df['venue'] == self.venue_filter].copy()
-            if len(df) == 0:
-                raise ValueError(f"Venue '{venue_name}' not found in data")
-            # IMPORTANT: Update self.df to the filtered data so subsequent operations use correct data
-            self.df = df
-            print(f"Separate mode: Loaded {len(df)} records for {venue_name} only")
+        if self.preloaded_df is None:
+            # Separate mode only reads this venue's file
+            df = super().load_data(filter_venue=self.venue_filter if separate else None)
+        else:
+            # Reuse data another engine already loaded (a shallow copy-on-write
+            # copy, so neither engine sees the other's edits)
+            df = self.df = self.preloaded_df.copy(deep=False)
+            
+            # Filter to single venue if in separate mode
+            if separate:
+                # Compare categorical codes instead of venue strings; boolean indexing
+                # already returns a new frame (copy-on-write), so no explicit copy
+                venues = df['venue'].cat.categories
+                if self.venue_filter not in venues:
+                    raise ValueError(f"Venue '{self.venue_filter}' not found in data")
+                df = df[df['venue'].cat.codes.to_numpy() == venues.get_loc(self.venue_filter)]
+                # IMPORTANT: Update self.df to the filtered data so subsequent operations use correct data
+                self.df = df
+        
+        if separate:
+            print(f"Separate mode: Loaded {len(df)} records for {self.venue_filter} only")
         
         return df
     
@@ -67,27 +89,24 @@ class FlexiblePricingEngine(PricingEngine):
         if self.external_benchmarks:
             # Use external benchmarks (from API or shared service)
             self.global_avg_price = self.external_benchmarks.get('global_median')
-            self.brand_medians = self.external_benchmarks.get('brand_medians', {})
-            self.type_medians = self.external_benchmarks.get('type_medians', {})
+            self.brand_medians = pd.Series(self.external_benchmarks.get('brand_medians', {}), dtype=float)
+            self.type_medians = pd.Series(self.external_benchmarks.get('type_medians', {}), dtype=float)
             
-            # Compute BPS from external benchmarks
-            self.brand_bps = {}
-            for bottle, brand_median in self.brand_medians.items():
-                # Try to find type from our data
-                if self.df is not None:
-                    brand_data = self.df[self.df['bottle_normalized'] == bottle]
-                    if len(brand_data) > 0:
-                        bottle_type = brand_data['type'].iloc[0]
-                        type_median = self.type_medians.get(bottle_type, brand_median)
-                    else:
-                        type_median = brand_median
-                else:
-                    type_median = brand_median
-                
-                if type_median > 0:
-                    self.brand_bps[bottle] = brand_median / type_median
-                else:
-                    self.brand_bps[bottle] = 1.0
+            # Compute BPS from external benchmarks: each brand's type is the type of its
+            # first row in our data, looked up for all brands in one pass
+            type_medians = self.brand_medians
+            if self.df is not None:
+                first_rows = self.df.drop_duplicates('bottle_normalized')
+                brand_types = pd.Series(
+                    first_rows['type'].to_numpy(dtype=object),
+                    index=first_rows['bottle_normalized'].to_numpy(dtype=object)
+                )
+                type_medians = (
+                    brand_types.reindex(self.brand_medians.index).map(self.type_medians)
+                    .astype('float64').fillna(self.brand_medians)
+                )
+            self.brand_bps = (self.brand_medians / type_medians).where(type_medians > 0, 1.0).to_dict()
+            self._market_price_cached.cache_clear()
             
             print(f"Using external benchmarks:")
             print(f"  Global median price: ${self.global_avg_price:.2f}")
@@ -110,7 +129,11 @@ class FlexiblePricingEngine(PricingEngine):
         
         if self.mode == "separate" and self.venue_filter:
             # Single venue mode: compute VPI for just this venue
-            venue_median = self.df['price'].median()
+            # The loaded data doesn't change until the next load_data(), so the
+            # median (one np.median selection pass, no sort) is computed once
+            if self._venue_median is None:
+                self._venue_median = round(float(np.median(self.df['price'].to_numpy())), MEDIAN_DECIMALS)
+            venue_median = self._venue_median
             self.venue_vpi[self.venue_filter] = venue_median / self.global_avg_price if self.global_avg_price > 0 else 1.0
             print(f"\nVenue Premium Index (VPI) for {self.venue_filter}: {self.venue_vpi[self.venue_filter]:.3f}")
         else:
@@ -167,7 +190,8 @@ def create_unified_engine(csv_dir: str = ".") -> PricingEngine:
 
 
 def create_separate_engine(csv_dir: str = ".", venue_name: str = "NYX Rooftop Lounge", 
-                          external_benchmarks: Optional[Dict] = None) -> FlexiblePricingEngine:
+                          external_benchmarks: Optional[Dict] = None,
+                          preloaded_df: Optional[pd.DataFrame] = None) -> FlexiblePricingEngine:
     """
     Create engine in separate mode (single venue with external benchmarks).
     
@@ -176,16 +200,18 @@ def create_separate_engine(csv_dir: str = ".", venue_name: str = "NYX Rooftop Lo
         unified = create_unified_engine()
         benchmarks = FlexiblePricingEngine.create_from_unified_engine(unified)
         
-        # Create separate instance for one venue
+        # Create separate instance for one venue, reusing the already-loaded data
         separate = create_separate_engine(
             venue_name="NYX Rooftop Lounge",
-            external_benchmarks=benchmarks
+            external_benchmarks=benchmarks,
+            preloaded_df=unified.df
         )
     """
     engine = FlexiblePricingEngine(
         csv_dir=csv_dir,
         mode="separate",
-        external_benchmarks=external_benchmarks
+        external_benchmarks=external_benchmarks,
+        preloaded_df=preloaded_df
     )
     engine.load_data(venue_name=venue_name)
     engine.compute_benchmarks()
@@ -193,9 +219,35 @@ def create_separate_engine(csv_dir: str = ".", venue_name: str = "NYX Rooftop Lo
     return engine
 
 
-if __name__ == "__main__":
-    import os
+def _separate_recommendations(args: Tuple[str, str, Optional[Dict]]) -> pd.DataFrame:
+    """Process-pool worker: one venue's recommendations from its own separate engine."""
+    csv_dir, venue_name, external_benchmarks = args
+    return create_separate_engine(csv_dir, venue_name, external_benchmarks).generate_all_recommendations()
+
+
+def generate_separate_recommendations(csv_dir: str, venue_names: List[str], external_benchmarks: Dict,
+                                      max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Recommendations for several venues, each priced by its own separate-mode engine.
+    
+    Venues only share the (read-only) benchmarks, so each one runs in its own
+    worker process and only reads its own CSV.
     
+    Returns:
+        All venues' recommendations, in venue_names order
+    """
+    if max_workers is None:
+        max_workers = min(len(venue_names), os.cpu_count() or 1)
+    # Spawned, not forked: the parent's numba/pyarrow thread pools aren't fork-safe
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = list(pool.map(
+            _separate_recommendations,
+            [(csv_dir, venue_name, external_benchmarks) for venue_name in venue_names]
+        ))
+    return pd.concat(results, ignore_index=True)
+
+
+if __name__ == "__main__":
     # Example 1: Unified mode (current approach)
     print("=" * 80)
     print("EXAMPLE 1: Unified Mode (All Venues Together)")
@@ -215,7 +267,8 @@ if __name__ == "__main__":
     separate_nyx = create_separate_engine(
         csv_dir=csv_dir,
         venue_name="NYX Rooftop Lounge",
-        external_benchmarks=benchmarks
+        external_benchmarks=benchmarks,
+        preloaded_df=unified.df
     )
     
     # Generate recommendations for NYX only
@@ -9,11 +9,10 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional
 from datetime import datetime
-import os
-from pathlib import Path
 
 from pricing_engine import PricingEngine
-from demand_engine import DemandPredictionModel, PriceOptimizer
+from demand_engine import DemandContext, DemandPredictionModel, PriceOptimizer
+from guardrail_kernel import round_and_clamp
 
 try:
     from cost_manager import CostManager
@@ -22,6 +21,12 @@ except ImportError:
     COST_MANAGER_AVAILABLE = False
     CostManager = None
 
+# optimize_price result fields copied into the hybrid recommendations
+_OPTIMIZATION_FIELDS = (
+    'optimal_price', 'current_demand', 'optimal_demand', 'current_revenue',
+    'optimal_revenue', 'revenue_improvement', 'revenue_improvement_pct'
+)
+
 
 class HybridPricingEngine(PricingEngine):
     """
@@ -162,6 +167,7 @@ class HybridPricingEngine(PricingEngine):
         max_change_pct: float = 0.15,
         rounding_base: int = 25,
         use_current_time: bool = True,
+        df: Optional[pd.DataFrame] = None,
         **demand_kwargs
     ) -> pd.DataFrame:
         """
@@ -171,12 +177,21 @@ class HybridPricingEngine(PricingEngine):
             max_change_pct: Maximum price change percentage
             rounding_base: Rounding base for prices
             use_current_time: Use current date/time for demand predictions
+            df: Catalog rows to price; defaults to all loaded data
             **demand_kwargs: Additional demand signal parameters
         """
+        if not (self.use_demand_optimization and self.price_optimizer):
+            # No demand model: the Phase 1 catalog run is the whole answer
+            return self.generate_all_recommendations(
+                max_change_pct=max_change_pct,
+                rounding_base=rounding_base,
+                df=df
+            ).assign(method='market_benchmark')
+        
         if self.df is None:
             self.load_data()
         
-        if not self.venue_vpi:
+        if self.venue_vpi.empty:
             self.compute_vpi()
         
         # Set time defaults if using current time
@@ -191,20 +206,82 @@ class HybridPricingEngine(PricingEngine):
             if 'month' not in demand_kwargs:
                 demand_kwargs['month'] = now.month
         
-        recommendations = []
+        # Phase 1 baseline for the whole catalog (vectorized)
+        recs = self.generate_all_recommendations(
+            max_change_pct=max_change_pct,
+            rounding_base=rounding_base,
+            df=df
+        )
         
-        for _, row in self.df.iterrows():
-            rec = self.recommend_price_v2(
-                venue=row['venue'],
-                bottle=row['bottle'],
-                bottle_type=row['type'],
-                current_price=row['price'],
-                max_change_pct=max_change_pct,
-                rounding_base=rounding_base,
-                **demand_kwargs
+        # All products' price sweeps go to the demand model in one batched call
+        try:
+            # Demand conditions are the same for every product: resolve them once
+            context = DemandContext.resolve(**demand_kwargs)
+            optimizations = self.price_optimizer.optimize_prices_batch([
+                dict(
+                    venue=venue, bottle=bottle, bottle_type=bottle_type, current_price=current_price,
+                    min_price=min_price, max_price=max_price, price_step=rounding_base
+                )
+                for venue, bottle, bottle_type, current_price, min_price, max_price in zip(
+                    recs['venue'].tolist(), recs['bottle'].tolist(), recs['type'].tolist(),
+                    recs['current_price'].tolist(), recs['min_price'].tolist(), recs['max_price'].tolist()
+                )
+            ], context=context)
+        except Exception as e:
+            # Fall back to market benchmarking if demand optimization fails
+            print(f"Warning: Demand optimization failed: {e}. Falling back to market benchmarking.")
+            recs['method'] = 'market_benchmark_fallback'
+            return recs
+        
+        # Products without a usable optimization (e.g. no profitable price) keep the baseline
+        optimized = np.array(['revenue_improvement' in opt for opt in optimizations], dtype=bool)
+        if not optimized.all():
+            print(f"Warning: Demand optimization failed for {int((~optimized).sum())} products. "
+                  "Falling back to market benchmarking.")
+        
+        # Optimizer results as preallocated float64 columns, filled in one pass
+        field = {key: np.full(len(optimizations), np.nan) for key in _OPTIMIZATION_FIELDS}
+        for i in np.flatnonzero(optimized).tolist():
+            opt = optimizations[i]
+            for key, column in field.items():
+                column[i] = opt[key]
+        
+        revenue_improvement = field['revenue_improvement']
+        revenue_improvement_pct = field['revenue_improvement_pct']
+        use_demand = optimized & (revenue_improvement > 0)
+        
+        # Use demand-optimized price if it's better, then round and apply guardrails
+        current_price = recs['current_price'].to_numpy(dtype=np.float64)
+        min_price = recs['min_price'].to_numpy(dtype=np.float64)
+        max_price = recs['max_price'].to_numpy(dtype=np.float64)
+        target_price = np.where(use_demand, field['optimal_price'], recs['recommended_price'].to_numpy(dtype=np.float64))
+        recommended_price = round_and_clamp(target_price, min_price, max_price, float(rounding_base))
+        recommended_price = np.where(optimized, recommended_price, recs['recommended_price'].to_numpy(dtype=np.float64))
+        
+        baseline_reason = recs['reason'].tolist()
+        reason = [
+            (f"Demand-optimized: Revenue improvement of ${imp:.2f} (+{imp_pct:.1f}%) predicted" if demand
+             else base + " (demand model confirms market-based recommendation)") if ok else base
+            for ok, demand, imp, imp_pct, base in zip(
+                optimized.tolist(), use_demand.tolist(), revenue_improvement.tolist(),
+                revenue_improvement_pct.tolist(), baseline_reason
             )
-            recommendations.append(rec)
+        ]
         
-        return pd.DataFrame(recommendations)
-
-
+        delta_pct = ((recommended_price - current_price) / current_price) * 100
+        recs['recommended_price'] = recommended_price
+        recs['delta_pct'] = np.where(optimized, np.round(delta_pct, 1), recs['delta_pct'])
+        recs['delta_abs'] = np.where(optimized, np.round(recommended_price - current_price, 2), recs['delta_abs'])
+        recs['reason'] = reason
+        recs['method'] = np.where(
+            optimized, np.where(use_demand, 'demand_optimization', 'market_benchmark'), 'market_benchmark_fallback'
+        )
+        if optimized.any():
+            recs['predicted_demand_current'] = field['current_demand']
+            recs['predicted_demand_optimal'] = field['optimal_demand']
+            recs['predicted_revenue_current'] = field['current_revenue']
+            recs['predicted_revenue_optimal'] = field['optimal_revenue']
+            recs['revenue_improvement'] = revenue_improvement
+            recs['revenue_improvement_pct'] = revenue_improvement_pct
+        
+        return recs
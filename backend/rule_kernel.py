@@ -0,0 +1,65 @@
+"""
+Rule engine kernel for the fallback pricing path in app.py.
+
+Active rules are encoded once into two parallel arrays (rule type codes and
+adjustment factors) so the multiplier loop runs as compiled code instead of
+comparing rule_type strings per request.
+"""
+
+import numpy as np
+from numba_compat import njit
+
+RULE_TYPE_CODES = {
+    'inventory_low': 0,
+    'time_of_day': 1,
+}
+UNKNOWN_RULE_TYPE = -1
+INVENTORY_LOW = RULE_TYPE_CODES['inventory_low']
+LOW_INVENTORY_THRESHOLD = 10  # inventory_low rules fire below this many units
+
+# Ethical guardrails (PRD: max +20% / max -15%)
+MIN_MULTIPLIER = 0.85
+MAX_MULTIPLIER = 1.20
+
+
+def encode_rules(rules):
+    """
+    Encode (rule_type, adjustment_factor) pairs as kernel input arrays.
+
+    Returns:
+        Tuple of (codes: int8 array, factors: float64 array)
+    """
+    codes = np.array(
+        [RULE_TYPE_CODES.get(rule_type, UNKNOWN_RULE_TYPE) for rule_type, _ in rules],
+        dtype=np.int8
+    )
+    factors = np.array([factor for _, factor in rules], dtype=np.float64)
+    return codes, factors
+
+
+@njit(cache=True)
+def apply_rules(codes, factors, inventory_count):
+    """
+    Combine the adjustment factors of all rules that fire.
+
+    Returns:
+        Tuple of (multiplier, number of rules applied)
+    """
+    multiplier = 1.0
+    applied = 0
+    for i in range(codes.shape[0]):
+        if codes[i] == INVENTORY_LOW and inventory_count < LOW_INVENTORY_THRESHOLD:
+            multiplier *= factors[i]
+            applied += 1
+    return multiplier, applied
+
+
+@njit(cache=True)
+def apply_guardrails(multiplier):
+    """Clamp a price multiplier to the allowed range."""
+    return max(MIN_MULTIPLIER, min(MAX_MULTIPLIER, multiplier))
+
+
+# Compile at import so the first pricing request doesn't pay the JIT cost
+apply_rules(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float64), 0)
+apply_guardrails(1.0)
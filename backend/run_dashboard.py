@@ -9,7 +9,10 @@ if __name__ == "__main__":
     # Get the directory of this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     dashboard_path = os.path.join(script_dir, "pricing_dashboard.py")
+    cmd = [sys.executable, "-m", "streamlit", "run", dashboard_path]
     
-    # Run streamlit
-    subprocess.run([sys.executable, "-m", "streamlit", "run", dashboard_path])
-
+    # Run streamlit - on POSIX replace this interpreter instead of keeping it
+    # resident as an idle parent (Windows has no real exec, so spawn there)
+    if os.name == "posix":
+        os.execv(sys.executable, cmd)
+    subprocess.run(cmd)
@@ -0,0 +1,35 @@
+"""
+Grouped statistics kernels shared by the pricing and cost modules.
+"""
+
+import numpy as np
+from numba_compat import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def _sorted_group_medians(sorted_values, offsets):
+    n_groups = offsets.shape[0] - 1
+    out = np.empty(n_groups)
+    for g in prange(n_groups):
+        out[g] = np.median(sorted_values[offsets[g]:offsets[g + 1]])
+    return out
+
+
+def group_medians(codes, values, n_groups):
+    """
+    Median of `values` per group code (0..n_groups-1), one group per thread.
+
+    Args:
+        codes: Integer group code per value (e.g. from pd.factorize); every group non-empty
+        values: float values (no NaNs)
+        n_groups: Number of groups
+
+    Returns:
+        float64 array of medians indexed by group code
+    """
+    codes = np.asarray(codes)
+    order = np.argsort(codes, kind='stable')
+    sorted_values = np.ascontiguousarray(np.asarray(values, dtype=np.float64)[order])
+    offsets = np.zeros(n_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=n_groups), out=offsets[1:])
+    return _sorted_group_medians(sorted_values, offsets)
@@ -4,7 +4,9 @@ Test script to demonstrate the pricing engine capabilities
 import pandas as pd
 import os
 from pricing_engine import PricingEngine
-from pricing_engine_flexible import FlexiblePricingEngine, create_unified_engine, create_separate_engine
+from pricing_engine_flexible import (
+    FlexiblePricingEngine, create_unified_engine, create_separate_engine, generate_separate_recommendations
+)
 
 def print_section(title):
     print("\n" + "="*80)
@@ -83,7 +85,8 @@ def main():
     separate_nyx = create_separate_engine(
         csv_dir=csv_dir,
         venue_name="NYX Rooftop Lounge",
-        external_benchmarks=benchmarks
+        external_benchmarks=benchmarks,
+        preloaded_df=unified.df
     )
     
     # Show VPI for this venue
@@ -100,6 +103,17 @@ def main():
     print(f"   Decreases: {len(nyx_recs_filtered[nyx_recs_filtered['delta_pct'] < -1])}")
     print(f"   No change: {len(nyx_recs_filtered[abs(nyx_recs_filtered['delta_pct']) < 1])}")
     
+    # Test 3: A separate instance per venue, run in parallel worker processes
+    print_section("TEST 3: Separate Mode - Every Venue in Parallel")
+    
+    venues = list(unified.venue_vpi.index)
+    separate_recs = generate_separate_recommendations(csv_dir, venues, benchmarks)
+    
+    print(f"\n>>> Recommendations per venue:")
+    for venue, count in separate_recs['venue'].value_counts(sort=False).items():
+        print(f"   {venue:25s} {count} products")
+    assert len(separate_recs) == len(unified.df)
+    
     print_section("TEST COMPLETE")
     print("\n[SUCCESS] All tests passed!")
     print("\n>>> Next steps:")
@@ -4,6 +4,8 @@ Test Phase 2: Demand-based pricing engine
 
 import os
 from pathlib import Path
+import numpy as np
+from cost_manager import CostManager
 from demand_engine import DemandPredictionModel, PriceOptimizer
 from pricing_engine_v2 import HybridPricingEngine
 from train_demand_model import main as train_model
@@ -41,6 +43,12 @@ def test_demand_prediction():
     print(f"  Price: $350")
     print(f"  Conditions: Saturday 10 PM, DJ event, 50% inventory")
     print(f"  Predicted bottles sold: {predicted:.1f}")
+    
+    # The compiled tree kernel used for small batches must match XGBoost exactly
+    if model._compiled is not None:
+        X = model._feature_matrix(np.arange(100, 1000, 25.0), venue="NYX Rooftop Lounge", bottle="Grey Goose",
+                                  bottle_type="Vodka", day_of_week=5, hour=22, is_weekend=True, event_type="DJ")
+        assert (model._compiled.predict(X) == model._booster.inplace_predict(X, iteration_range=model._iteration_range)).all()
     print("[OK] Demand prediction working\n")
 
 
@@ -76,6 +84,44 @@ def test_price_optimization():
     print(f"  Optimal predicted revenue: ${result['optimal_revenue']:.2f}")
     print(f"\n  Revenue improvement: ${result['revenue_improvement']:.2f} (+{result['revenue_improvement_pct']:.1f}%)")
     print(f"  Price change: ${result['price_change']:.2f} ({result['price_change_pct']:+.1f}%)")
+
+    # Batch optimization must agree with the per-product path
+    batch = optimizer.optimize_prices_batch([
+        dict(venue="NYX Rooftop Lounge", bottle="Grey Goose", bottle_type="Vodka", current_price=350,
+             day_of_week=5, hour=22, is_weekend=True, event_type="DJ"),
+        dict(venue="Twelve After Twelve", bottle="Dom Perignon", bottle_type="Champagne", current_price=900,
+             day_of_week=5, hour=22, is_weekend=True, event_type="DJ")
+    ])
+    assert batch[0] == result
+    assert batch[1]['optimal_price'] == optimizer.optimize_price(
+        venue="Twelve After Twelve", bottle="Dom Perignon", bottle_type="Champagne", current_price=900,
+        day_of_week=5, hour=22, is_weekend=True, event_type="DJ"
+    )['optimal_price']
+    
+    # Without a cost table there is no closed-form optimum: elasticity search falls back to the grid
+    assert optimizer.optimize_price(
+        venue="NYX Rooftop Lounge", bottle="Grey Goose", bottle_type="Vodka", current_price=350,
+        day_of_week=5, hour=22, is_weekend=True, event_type="DJ", search='elasticity'
+    ) == result
+    
+    # With costs and elastic demand (Tito's, weekday 6 PM DJ: e < -1) the closed-form
+    # optimum p* = cost * e / (1 + e) is used, snapped to the price_step grid
+    cost_manager = CostManager()
+    context = dict(venue="NYX Rooftop Lounge", bottle="Titos", bottle_type="Vodka",
+                   day_of_week=1, hour=18, is_weekend=False, event_type="DJ")
+    elasticity = model.local_elasticity(300.0, **context)
+    assert elasticity < -1
+    elastic = PriceOptimizer(model, cost_manager).optimize_price(current_price=300.0, search='elasticity', **context)
+    cost = cost_manager.get_cost("Titos", "Vodka", 300.0)
+    min_price = max(300.0 * 0.7, cost_manager.get_minimum_price(cost))
+    optimum = [row for row in elastic['price_range'] if row['price'] != 300.0]
+    assert len(optimum) == 1
+    optimum = optimum[0]
+    assert min_price <= optimum['price'] <= 300.0 * 1.5
+    assert abs(optimum['price'] - cost * elasticity / (1 + elasticity)) <= 2.5
+    assert float((optimum['price'] - min_price) / 5.0).is_integer()
+    assert optimum['profit'] > 0 and optimum['profit_margin_pct'] >= cost_manager.min_profit_margin_pct * 100
+    assert elastic['optimal_profit'] >= elastic['current_profit']
     print("[OK] Price optimization working\n")
 
 
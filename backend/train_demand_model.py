@@ -7,15 +7,18 @@ This script:
 3. Saves model for use in pricing engine
 """
 
-import pandas as pd
 import os
+import sys
 from pathlib import Path
 from demand_engine import DemandPredictionModel
-from generate_demand_data import generate_demand_data
+from generate_demand_data import generate_demand_data, load_demand_history
 
 
-def main():
-    data_path = Path(__file__).parent / 'data' / 'demand_history.csv'
+def main(data_path: str = None):
+    """Train on demand history at data_path (CSV or .parquet; default data/demand_history.csv)."""
+    if data_path is None:
+        data_path = Path(__file__).parent / 'data' / 'demand_history.csv'
+    data_path = Path(data_path)
     model_path = Path(__file__).parent / 'models' / 'demand_model.joblib'
     
     # Generate or load data
@@ -24,7 +27,7 @@ def main():
         df = generate_demand_data(n_samples=5000, output_path=str(data_path))
     else:
         print(f"Loading demand history from {data_path}")
-        df = pd.read_csv(data_path)
+        df = load_demand_history(data_path)
     
     print(f"\nLoaded {len(df)} records")
     print(f"Date range: {df['date'].min()} to {df['date'].max()}")
@@ -61,6 +64,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
 
 
@@ -0,0 +1,33 @@
+"""
+Shared reader for the "Drink Pricing - <venue>.csv" files.
+
+Only the columns the pricing code uses are parsed, and "$1,200"-style price
+strings are converted to floats in one vectorized pass over the combined data.
+"""
+
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - enables pandas' multithreaded pyarrow CSV reader
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Venue CSV columns we use, and their standardized names
+CSV_COLUMNS = {'Name': 'bottle', 'Type of Liquor': 'type', 'Price': 'price'}
+
+# Everything that can't be part of a number ("$", ",", spaces, currency text)
+_PRICE_RE = re.compile(r'[^\d.\-]')
+
+
+def read_venue_csv(csv_file) -> pd.DataFrame:
+    """Read one venue CSV as bottle/type/price string columns."""
+    df = pd.read_csv(csv_file, engine=CSV_ENGINE, usecols=list(CSV_COLUMNS), dtype=str)
+    return df.rename(columns=CSV_COLUMNS)
+
+
+def parse_prices(prices: pd.Series) -> pd.Series:
+    """Convert price strings to floats; unparseable values become NaN."""
+    return pd.to_numeric(prices.str.replace(_PRICE_RE, '', regex=True), errors='coerce')
@@ -3,55 +3,87 @@ Phase 3: Professional Web Application
 Modern Flask-based web app with integrated Phase 1 + Phase 2 pricing engine
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
 from pathlib import Path
 from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
 import pandas as pd
 import numpy as np
-import json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
 
-from pricing_engine import PricingEngine
+from pricing_engine import PricingEngine, float64_prices
 from pricing_engine_v2 import HybridPricingEngine
-from demand_engine import DemandPredictionModel, PriceOptimizer
+from demand_engine import DemandContext, DemandPredictionModel, PriceOptimizer
 from cost_manager import CostManager
 
 
-def convert_numpy_types(obj):
-    """Convert NumPy types to native Python types for JSON serialization"""
-    # Handle NumPy arrays FIRST (before scalar checks)
+def _json_default(obj):
+    """
+    Encode the few values the JSON encoder doesn't handle itself.
+    
+    orjson already encodes NumPy scalars/arrays (and NaN as null); the NumPy
+    branches only matter for the stdlib json fallback.
+    """
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, pd.Timedelta, Decimal)):
+        return str(obj)
     if isinstance(obj, np.ndarray):
         return obj.tolist()
-    # Handle NumPy scalars
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    # Handle pandas types
-    elif isinstance(obj, (pd.Timestamp, pd.Timedelta)):
-        return str(obj)
-    # Check for NaN values (only for scalar values, not arrays)
-    elif not isinstance(obj, (dict, list, tuple)) and pd.isna(obj):
-        return None
-    # Handle collections
-    elif isinstance(obj, dict):
-        return {str(key): convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [convert_numpy_types(item) for item in obj]
-    # Handle other NumPy types (fallback)
-    elif hasattr(obj, 'item'):  # NumPy scalar
-        try:
-            return obj.item()
-        except (ValueError, AttributeError):
-            return obj
-    return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    jsonify() through orjson: NumPy scalars and arrays are encoded natively
+    and NaN becomes null, so responses need no conversion pass first.
+    """
+    
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS  # keep Flask's sorted-key output
+        return orjson.dumps(obj, default=_json_default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """stdlib json provider that also encodes NumPy/pandas values (no orjson)."""
+    
+    default = staticmethod(_json_default)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app) if ORJSON_AVAILABLE else NumpyJSONProvider(app)
 CORS(app)
 
+# Compress JSON responses (bulk recommendations run to hundreds of KB);
+# small ones aren't worth the CPU
+app.config.update(
+    COMPRESS_MIMETYPES=['application/json'],
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_MIN_SIZE=2048
+)
+if COMPRESS_AVAILABLE:
+    Compress(app)
+
 # Initialize engines
 BASE_DIR = Path(__file__).parent
 CSV_DIR = BASE_DIR.parent
@@ -82,13 +114,18 @@ phase1_engine.load_data()
 phase1_engine.compute_benchmarks()
 phase1_engine.compute_vpi()
 
+# Each venue's catalog rows, sliced once: the data doesn't change while the
+# app runs, so requests look a venue up instead of masking the whole catalog
+VENUE_FRAMES = {str(venue): rows for venue, rows in phase1_engine.df.groupby('venue', observed=True, sort=False)}
+VENUES = list(VENUE_FRAMES)  # order of first appearance, as df['venue'].unique()
+
 # Phase 2 engine (if model available)
 phase2_engine = None
 demand_model = None
 phase2_available = False
 model_path = BASE_DIR / 'models' / 'demand_model.joblib'
 
-if model_path.exists():
+if DemandPredictionModel.saved_model_exists(str(model_path)):
     try:
         demand_model = DemandPredictionModel()
         demand_model.load(str(model_path))
@@ -117,6 +154,65 @@ if model_path.exists():
 else:
     print("Phase 2 model not found - using Phase 1 (Market Benchmarking) only")
 
+
+def _warm_up():
+    """
+    Run each pricing path once with a real catalog row so the first requests
+    of a fresh worker don't pay one-time setup costs (XGBoost predictor
+    buffers, first cost lookups, kernel dispatch).
+    """
+    venue, rows = next(iter(VENUE_FRAMES.items()))
+    bottle, bottle_type, price = str(rows['bottle'].iloc[0]), str(rows['type'].iloc[0]), float(rows['price'].iloc[0])
+    phase1_engine.recommend_price(venue=venue, bottle=bottle, bottle_type=bottle_type, current_price=price)
+    if phase2_engine and phase2_available:
+        phase2_engine.recommend_price_v2(venue=venue, bottle=bottle, bottle_type=bottle_type, current_price=price)
+        # One venue's batched sweep is large enough to go through XGBoost itself
+        phase2_engine.generate_all_recommendations_v2(df=rows)
+
+try:
+    _warm_up()
+except Exception as e:
+    print(f"Warning: Warm-up failed (first requests may be slower): {e}")
+
+@lru_cache(maxsize=4096)
+def _recommendation_cached(model_version, cost_key, venue, bottle, bottle_type, current_price,
+                           day_of_week, hour, is_weekend, event_type, inventory_level, month):
+    """Phase 2 recommendation behind recommend_v2_cached (model_version / cost_key only split cache entries)."""
+    return phase2_engine.recommend_price_v2(
+        venue=venue,
+        bottle=bottle,
+        bottle_type=bottle_type,
+        current_price=current_price,
+        day_of_week=day_of_week,
+        hour=hour,
+        is_weekend=is_weekend,
+        event_type=event_type,
+        inventory_level=inventory_level,
+        month=month
+    )
+
+
+def recommend_v2_cached(venue, bottle, bottle_type, current_price, day_of_week=None, hour=None,
+                        is_weekend=None, event_type='regular', inventory_level=1.0) -> dict:
+    """
+    phase2_engine.recommend_price_v2, memoized per product and demand signals.
+    
+    Time defaults are resolved first so the current day/hour is part of the
+    key; the demand model and cost table versions are too, so retraining or
+    editing costs never serves a stale recommendation.
+    """
+    context = DemandContext.resolve(day_of_week=day_of_week, hour=hour, is_weekend=is_weekend)
+    cost_key = None
+    if cost_manager:
+        cost_key = (getattr(cost_manager, '_version', None), cost_manager.min_profit_margin_pct)
+    rec = _recommendation_cached(
+        getattr(demand_model, '_version', None), cost_key,
+        venue, bottle, bottle_type, round(float(current_price), 2),
+        context.day_of_week, context.hour, context.is_weekend, event_type,
+        round(float(inventory_level), 2), context.month
+    )
+    return dict(rec)  # Copy so callers can't alter the cached entry
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -130,8 +226,7 @@ def favicon():
 @app.route('/api/venues')
 def get_venues():
     """Get list of all venues"""
-    venues = phase1_engine.df['venue'].unique().tolist()
-    return jsonify(venues)
+    return app.response_class(VENUES_JSON, mimetype='application/json')
 
 @app.route('/api/products')
 def get_products():
@@ -140,9 +235,11 @@ def get_products():
     if not venue:
         return jsonify({'error': 'venue parameter required'}), 400
     
-    products = phase1_engine.df[phase1_engine.df['venue'] == venue][
-        ['bottle', 'type', 'price']
-    ].to_dict('records')
+    products = VENUE_FRAMES.get(venue)
+    if products is None:
+        return jsonify([])
+    products = products[['bottle', 'type', 'price']]
+    products = products.assign(price=float64_prices(products['price'])).to_dict('records')
     
     return jsonify(products)
 
@@ -154,9 +251,14 @@ def get_status():
         'phase': 2 if phase2_available else 1
     })
 
-@app.route('/api/market-analysis')
-def get_market_analysis():
-    """Get market analysis data"""
+@app.route('/api/cache/clear', methods=['POST'])
+def clear_cache():
+    """Drop memoized recommendations (e.g. after editing data files in place)"""
+    _recommendation_cached.cache_clear()
+    return jsonify({'status': 'ok'})
+
+def _market_analysis() -> dict:
+    """Market analysis payload: VPI per venue, type medians, global median."""
     vpi_data = [
         {'venue': str(venue), 'vpi': float(vpi), 'premium_pct': float((vpi - 1) * 100)}
         for venue, vpi in phase1_engine.venue_vpi.items()
@@ -167,22 +269,22 @@ def get_market_analysis():
         for k, v in sorted(phase1_engine.type_medians.items(), key=lambda x: x[1], reverse=True)
     ]
     
-    try:
-        result = {
-            'vpi': vpi_data,
-            'type_medians': type_medians,
-            'global_median': float(phase1_engine.global_avg_price),
-            'phase2_available': phase2_available
-        }
-        
-        # Convert NumPy types
-        result_clean = convert_numpy_types(result)
-        return jsonify(result_clean)
-    except Exception as e:
-        print(f"Error in market-analysis: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+    return {
+        'vpi': vpi_data,
+        'type_medians': type_medians,
+        'global_median': float(phase1_engine.global_avg_price),
+        'phase2_available': phase2_available
+    }
+
+# Venues, benchmarks and Phase 2 availability are fixed once the engines
+# above are loaded, so these responses are serialized a single time
+VENUES_JSON = app.json.dumps(VENUES)
+MARKET_ANALYSIS_JSON = app.json.dumps(_market_analysis())
+
+@app.route('/api/market-analysis')
+def get_market_analysis():
+    """Get market analysis data"""
+    return app.response_class(MARKET_ANALYSIS_JSON, mimetype='application/json')
 
 @app.route('/api/recommendations', methods=['POST'])
 def get_recommendations():
@@ -206,7 +308,7 @@ def get_recommendations():
     # Try Phase 2 first, fall back to Phase 1
     if phase2_engine:
         try:
-            rec = phase2_engine.recommend_price_v2(
+            rec = recommend_v2_cached(
                 venue=venue,
                 bottle=bottle,
                 bottle_type=bottle_type,
@@ -218,9 +320,7 @@ def get_recommendations():
                 inventory_level=inventory_level
             )
             rec['phase'] = 2
-            # Convert NumPy types to native Python types
-            rec_clean = convert_numpy_types(rec)
-            return jsonify(rec_clean)
+            return jsonify(rec)
         except Exception as e:
             print(f"Phase 2 recommendation failed: {e}")
             import traceback
@@ -234,9 +334,22 @@ def get_recommendations():
         current_price=current_price
     )
     rec['phase'] = 1
-    # Convert NumPy types to native Python types
-    rec_clean = convert_numpy_types(rec)
-    return jsonify(rec_clean)
+    return jsonify(rec)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+RECORD_CHUNK_ROWS = 256
+
+
+def _iter_records(recs: pd.DataFrame):
+    """
+    Yield the rows of a recommendations frame as dicts, a chunk of rows at a time.
+    
+    Columns a product has no value for (NaN) are left out, as in /api/recommendations.
+    """
+    for start in range(0, len(recs), RECORD_CHUNK_ROWS):
+        for rec in recs.iloc[start:start + RECORD_CHUNK_ROWS].to_dict('records'):
+            yield {key: value for key, value in rec.items() if value == value}
+
 
 @app.route('/api/bulk-recommendations', methods=['POST'])
 def get_bulk_recommendations():
@@ -252,73 +365,53 @@ def get_bulk_recommendations():
         event_type = data.get('event_type', 'regular')
         inventory_level = data.get('inventory_level', 1.0)
         
-        # Filter by venue if specified
+        # Filter by venue if specified (nothing below modifies df)
         if venue:
-            df = phase1_engine.df[phase1_engine.df['venue'] == venue].copy()
+            df = VENUE_FRAMES.get(venue)
         else:
-            df = phase1_engine.df.copy()
+            df = phase1_engine.df
         
-        if len(df) == 0:
+        if df is None or len(df) == 0:
             return jsonify([])
         
-        recommendations = []
-        
-        for idx, row in df.iterrows():
+        # The whole selection is priced in one vectorized pass (one batched
+        # demand-model call) instead of one recommendation per product
+        recs = None
+        if phase2_engine and phase2_available:
             try:
-                venue_name = str(row['venue'])
-                bottle_name = str(row['bottle'])
-                bottle_type = str(row['type'])
-                current_price = float(row['price'])
-                
-                if phase2_engine and phase2_available:
-                    try:
-                        rec = phase2_engine.recommend_price_v2(
-                            venue=venue_name,
-                            bottle=bottle_name,
-                            bottle_type=bottle_type,
-                            current_price=current_price,
-                            day_of_week=day_of_week,
-                            hour=hour,
-                            is_weekend=is_weekend,
-                            event_type=event_type,
-                            inventory_level=inventory_level
-                        )
-                        rec['phase'] = 2
-                    except Exception as e:
-                        # Fall back to Phase 1
-                        rec = phase1_engine.recommend_price(
-                            venue=venue_name,
-                            bottle=bottle_name,
-                            bottle_type=bottle_type,
-                            current_price=current_price
-                        )
-                        rec['phase'] = 1
-                else:
-                    # Use Phase 1 only
-                    rec = phase1_engine.recommend_price(
-                        venue=venue_name,
-                        bottle=bottle_name,
-                        bottle_type=bottle_type,
-                        current_price=current_price
-                    )
-                    rec['phase'] = 1
-                
-                # Convert NumPy types to native Python types
-                rec_clean = convert_numpy_types(rec)
-                recommendations.append(rec_clean)
+                recs = phase2_engine.generate_all_recommendations_v2(
+                    df=df,
+                    day_of_week=day_of_week,
+                    hour=hour,
+                    is_weekend=is_weekend,
+                    event_type=event_type,
+                    inventory_level=inventory_level
+                ).assign(phase=2)
             except Exception as e:
-                print(f"Error processing row {idx}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+                # Fall back to Phase 1
+                print(f"Phase 2 bulk recommendations failed: {e}")
+        if recs is None:
+            recs = phase1_engine.generate_all_recommendations(df=df).assign(phase=1)
         
-        return jsonify(recommendations)
+        # Clients that ask for ndjson get one recommendation per line as the rows are
+        # serialized, without the whole list being built and encoded first
+        if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+            def generate():
+                for rec in _iter_records(recs):
+                    yield app.json.dumps(rec) + '\n'
+            return Response(generate(), mimetype=NDJSON_MIMETYPE)
+        
+        return jsonify(list(_iter_records(recs)))
     except Exception as e:
         print(f"Error in bulk-recommendations: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# Price points /api/demand-prediction sweeps, as multiples of the current price (70% to 130%)
+DEMAND_CURVE_MULTIPLIERS = 0.7 + np.arange(13) * 0.05
+
+
 @app.route('/api/demand-prediction', methods=['POST'])
 def predict_demand():
     """Predict demand at different price points"""
@@ -334,50 +427,44 @@ def predict_demand():
         if not all([venue, bottle, bottle_type]):
             return jsonify({'error': 'Missing required parameters: venue, bottle, type'}), 400
         
-        # Demand signals
-        day_of_week = data.get('day_of_week', datetime.now().weekday())
-        hour = data.get('hour', datetime.now().hour)
-        is_weekend = data.get('is_weekend', datetime.now().weekday() >= 4)
+        # Demand signals (defaults from one clock read; Fri-Sun count as weekend, as in training)
+        now = datetime.now()
+        weekday = now.weekday()
+        day_of_week = data.get('day_of_week', weekday)
+        hour = data.get('hour', now.hour)
+        is_weekend = data.get('is_weekend', weekday >= 4)
         event_type = data.get('event_type', 'regular')
         inventory_level = data.get('inventory_level', 1.0)
         
         # Test price range
         current_price = float(data.get('price', 300))
-        price_range = [current_price * (0.7 + i * 0.05) for i in range(13)]  # 70% to 130%
+        prices = current_price * DEMAND_CURVE_MULTIPLIERS
         
-        predictions = []
-        for price in price_range:
-            try:
-                demand = demand_model.predict(
-                    price=float(price),
-                    venue=str(venue),
-                    bottle=str(bottle),
-                    bottle_type=str(bottle_type),
-                    day_of_week=int(day_of_week) if day_of_week is not None else None,
-                    hour=int(hour) if hour is not None else None,
-                    is_weekend=bool(is_weekend) if is_weekend is not None else None,
-                    event_type=str(event_type),
-                    inventory_level=float(inventory_level)
-                )
-                # Ensure all values are native Python types
-                pred = {
-                    'price': float(round(price, 2)),
-                    'predicted_demand': float(round(float(demand), 1)),
-                    'revenue': float(round(float(price) * float(demand), 2))
-                }
-                predictions.append(pred)
-            except Exception as e:
-                print(f"Error predicting at price ${price}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+        # One batched call for every price point (only the price column differs)
+        demands = demand_model.predict_batch(
+            prices,
+            venue=str(venue),
+            bottle=str(bottle),
+            bottle_type=str(bottle_type),
+            day_of_week=int(day_of_week) if day_of_week is not None else None,
+            hour=int(hour) if hour is not None else None,
+            is_weekend=bool(is_weekend) if is_weekend is not None else None,
+            event_type=str(event_type),
+            inventory_level=float(inventory_level)
+        )
+        predictions = [
+            {
+                'price': round(price, 2),
+                'predicted_demand': round(demand, 1),
+                'revenue': round(price * demand, 2)
+            }
+            for price, demand in zip(prices.tolist(), demands.tolist())
+        ]
         
         if not predictions:
             return jsonify({'error': 'No predictions generated'}), 500
         
-        # Convert NumPy types to native Python types (double-check)
-        predictions_clean = convert_numpy_types(predictions)
-        return jsonify(predictions_clean)
+        return jsonify(predictions)
     except Exception as e:
         print(f"Error in demand-prediction: {e}")
         import traceback
@@ -385,5 +472,6 @@ def predict_demand():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # Development server; production runs `gunicorn -c gunicorn_web.conf.py web_app:app`
     app.run(debug=True, port=5000, host='0.0.0.0')
 